@@ -0,0 +1,44 @@
+#####################################
+# Filename: bundle_assets.py
+# Description: Decodes, crops and scales every image ahead of time and writes
+#               the pixels to the asset bundle that the game memory-maps at startup
+#####################################
+import argparse, os, time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the pre-decoded image bundle that speeds up startup.')
+    parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame
+    from modules import data_loader
+    from modules.bundle import BUNDLED_IMAGES, BUNDLED_SHEETS, get_key, write_bundle
+    from modules.spritesheet import Spritesheet
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    # Remove the old bundle first so that every image below is decoded from its source file.
+    path = data_loader.get_image_path(data_loader.BUNDLE_FILENAME)
+    if os.path.exists(path):
+        os.remove(path)
+
+    start = time.time()
+    entries = []
+    for filename in BUNDLED_IMAGES:
+        source = data_loader.get_image_path(filename)
+        image = pygame.image.load(source)
+        entries.append((get_key(filename), source, [image], image.get_width(), image.get_height()))
+    for filename, num_in_row, num_in_col, scale in BUNDLED_SHEETS:
+        sheet = Spritesheet(filename, num_in_row, num_in_col, scale)
+        width, height = sheet.get_size()
+        entries.append((sheet.get_bundle_key(), data_loader.get_image_path(filename), sheet[:], width, height))
+    write_bundle(path + '.tmp', entries)
+    os.rename(path + '.tmp', path)
+    print('Bundled %d images (%d frames, %.1f MB) in %.2f seconds to %s.' %
+          (len(entries), sum(len(entry[2]) for entry in entries), os.path.getsize(path) / 1048576.0,
+           time.time() - start, path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#####################################
+# Filename: level_stats.py
+# Description: Generates many seeded level layouts in parallel and reports
+#               statistics about them, without opening a window
+#####################################
+import argparse, json, math, multiprocessing, os, time
+
+# Layout statistics recorded for every generated level
+METRICS = ('segments', 'rooms', 'generation_ms', 'width', 'height', 'endpoint_distance')
+
+_level = None   # Level object reused by every layout generated in a worker process
+
+
+def init_worker():
+    """ (None) -> None
+    Prepare a worker process to generate levels without a visible display.
+    """
+    global _level
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame, modules.level
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    _level = modules.level.Level('concrete.png', 'rockwall.png')
+
+
+def generate_layout(task):
+    """ (tuple) -> dict
+    Generate the layout for the given (seed, level number, screen width, screen height)
+    task and return the statistics of the result.
+    """
+    import random
+    seed, level_num, screen_w, screen_h = task
+    random.seed(seed)
+    _level.level_num = level_num
+    _level.screen_w, _level.screen_h = screen_w, screen_h
+    start = time.time()
+    _level.generate_layout()
+    elapsed = time.time() - start
+    rects = _level.paths + _level.rooms
+    bounds = rects[0].unionall(rects[1:])
+    start_x, start_y = _level.rooms[0].center
+    return {'seed': seed, 'level': level_num,
+            'segments': len(_level.paths),
+            'rooms': len(_level.rooms),
+            'generation_ms': 1000.0 * elapsed,
+            'aborted': _level.aborted,
+            'width': bounds.width,
+            'height': bounds.height,
+            'endpoint_distance': math.hypot(_level.endpoint[0] - start_x, _level.endpoint[1] - start_y)}
+
+
+def summarize(values):
+    """ (list) -> dict
+    Return the mean, standard deviation, minimum, maximum and percentiles of the given numbers.
+    """
+    values = sorted(values)
+    mean = sum(values) / float(len(values))
+    variance = sum((value - mean) ** 2 for value in values) / len(values)
+
+    def percentile(p):
+        return values[min(len(values) - 1, int(p / 100.0 * len(values)))]
+
+    return {'mean': mean, 'stdev': math.sqrt(variance), 'min': values[0], 'max': values[-1],
+            'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99)}
+
+
+def aggregate(results):
+    """ (list) -> dict
+    Return aggregate statistics for the given per-layout results, grouped by level number.
+    """
+    result = {}
+    for level_num in sorted(set(run['level'] for run in results)):
+        runs = [run for run in results if run['level'] == level_num]
+        stats = {'runs': len(runs),
+                 'abort_rate': sum(1 for run in runs if run['aborted']) / float(len(runs))}
+        for metric in METRICS:
+            stats[metric] = summarize([run[metric] for run in runs])
+        result['level %d' % level_num] = stats
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate seeded level layouts and report statistics.')
+    parser.add_argument('-n', '--runs', type=int, default=10000, help='layouts to generate per level')
+    parser.add_argument('-l', '--levels', type=int, nargs='+', default=[1, 2, 3, 4], help='level numbers')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed of the first layout')
+    parser.add_argument('-w', '--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'),
+                        help='screen size that the layouts are centered on')
+    parser.add_argument('-o', '--output', default='level_stats.json', help='aggregate statistics file')
+    parser.add_argument('--csv', help='optional file for the statistics of every layout')
+    args = parser.parse_args()
+
+    tasks = [(args.seed + i, level_num, args.size[0], args.size[1])
+             for level_num in args.levels for i in range(args.runs)]
+    start = time.time()
+    pool = multiprocessing.Pool(args.workers, init_worker)
+    try:
+        results = list(pool.imap_unordered(generate_layout, tasks, chunksize=64))
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - start
+
+    summary = aggregate(results)
+    summary['total'] = {'layouts': len(results), 'workers': args.workers, 'seconds': elapsed,
+                        'layouts_per_second': len(results) / elapsed}
+    with open(args.output, 'w') as output:
+        json.dump(summary, output, indent=2, sort_keys=True)
+    if args.csv:
+        columns = ('seed', 'level', 'aborted') + METRICS
+        with open(args.csv, 'w') as output:
+            output.write(','.join(columns) + '\n')
+            for run in sorted(results, key=lambda r: (r['level'], r['seed'])):
+                output.write(','.join(str(run[column]) for column in columns) + '\n')
+    print('Generated %d layouts in %.1f seconds on %d workers. Statistics written to %s.' %
+          (len(results), elapsed, args.workers, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#####################################
+# Filename: bot.py
+# Description: Scripted player used to play levels without a human
+#####################################
+
+import math
+from collections import defaultdict
+from random import randint
+from constants import *
+from controls import create_snapshot
+from navigation import FlowField
+from raycast import get_exit_fraction
+
+
+class Bot(object):
+    """ Scripted player that supplies inputs to a Level through its controller hook.
+    It fights enemies in sight, fetches food and ammo when it runs low, and otherwise
+    heads for the key and then the lock. """
+
+    sight = 450         # Furthest distance at which the bot shoots at enemies
+    hungry = HUNGER_LIMIT - 3
+    low_ammo = 3
+
+    def __init__(self):
+        """ (None) -> Bot
+        Instantiate a bot with no knowledge of the level yet.
+        """
+        self.flow_field = None      # FlowField toward the current goal
+        self.trigger = False        # Whether the shoot button was held during the last frame
+        self.last_position = None   # Screen co-ordinates of the level origin during the last frame
+        self.stuck_frames = 0       # Number of frames in a row without making progress
+        self.wander = 0             # Frames left to walk in a random direction
+        self.wander_key = K_w
+        self.inputs = None          # InputSnapshot produced during the last frame
+
+    def get_goal(self, level):
+        """ (Level) -> tuple
+        Return the on-screen co-ordinates that the bot wants to walk to.
+        """
+        player = level.player
+        wanted = []
+        if player.hunger >= self.hungry:
+            wanted.append('food')
+        if level.ammo <= self.low_ammo:
+            wanted.append('ammo')
+        if player.health <= 30:
+            wanted.append('health')
+        items = [item for item in level.items if item.is_alive() and item.type in wanted]
+        if items:
+            item = min(items, key=lambda i: (i.rect.centerx - player.x) ** 2 + (i.rect.centery - player.y) ** 2)
+            return item.rect.center
+        if level.key is not None and level.key.visible:
+            return level.key.rect.center
+        if level.lock is not None:
+            return level.lock.rect.center
+        return player.x, player.y
+
+    def get_target(self, level):
+        """ (Level) -> Enemy
+        Return the closest enemy that the bot can see and shoot, or None.
+        """
+        player = level.player
+        rects = level.paths + level.rooms
+        best, best_distance = None, self.sight ** 2
+        for enemy in level.enemies:
+            distance = (enemy.x - player.x) ** 2 + (enemy.y - player.y) ** 2
+            if distance < best_distance and \
+                    get_exit_fraction(rects, player.x, player.y, enemy.x - player.x, enemy.y - player.y) >= 1:
+                best, best_distance = enemy, distance
+        return best
+
+    def get_input(self, level):
+        """ (Level) -> InputSnapshot
+        Return a snapshot of the inputs that the bot presses for this frame.
+        """
+        self.inputs = create_snapshot(*self.choose_input(level), previous=self.inputs)
+        return self.inputs
+
+    def choose_input(self, level):
+        """ (Level) -> tuple
+        Return the (keys, mouse buttons, mouse position) that the bot presses for this frame.
+        """
+        player = level.player
+        keys = defaultdict(int)
+        target = self.get_target(level) if level.ammo > 0 else None
+        if target is not None:
+            # Stand still, aim at the enemy and pull the trigger every other frame.
+            self.trigger = not self.trigger
+            return keys, (int(self.trigger), 0, 1), (int(target.x), int(target.y))
+        self.trigger = False
+
+        # Keep track of whether the bot is making progress, and walk randomly for a while if not.
+        position = level.rooms[0].topleft
+        self.stuck_frames = self.stuck_frames + 1 if position == self.last_position else 0
+        self.last_position = position
+        if self.stuck_frames > 20:
+            self.wander = 30
+            self.wander_key = (K_w, K_a, K_s, K_d)[randint(0, 3)]
+        if self.wander > 0:
+            self.wander -= 1
+            keys[self.wander_key] = 1
+            return keys, (0, 0, 0), (player.x, player.y)
+
+        # Follow a flow field toward the goal, using whichever key points closest to the next waypoint.
+        if self.flow_field is None or self.flow_field.grid is not level.grid:
+            self.flow_field = FlowField(level.grid, len(level.grid))
+        self.flow_field.update(*self.get_goal(level))
+        waypoint = self.flow_field.get_waypoint(player.x, player.y)
+        if waypoint is not None:
+            dx, dy = waypoint[0] - player.x, waypoint[1] - player.y
+            if math.hypot(dx, dy) > 2:
+                if abs(dx) > abs(dy):
+                    keys[K_d if dx > 0 else K_a] = 1
+                else:
+                    keys[K_s if dy > 0 else K_w] = 1
+        return keys, (0, 0, 0), (player.x, player.y)
@@ -9,6 +9,8 @@ import math
 from constants import *
 from modules.shiftable import ShiftableObject
 
+_images = {}    # Bullet images keyed by (colour, radius)
+
 
 class Bullet(ShiftableObject):
 
@@ -17,12 +19,21 @@ class Bullet(ShiftableObject):
         Instantiate a Bullet object with the given position, colour, and velocity components.
         """
         ShiftableObject.__init__(self, x, y)
-        self.vx = int(top_speed * math.cos(math.radians(angle)))
-        self.vy = int(top_speed * -math.sin(math.radians(angle)))
-        self.colour = colour
         self.radius = 3
         self.rect = pygame.Rect(0, 0, self.radius, self.radius)
         self.damage = 50
+        self.reset(colour, x, y, top_speed, angle)
+
+    def reset(self, colour, x, y, top_speed, angle):
+        """ (tuple, int, int, int, float) -> None
+        Reinitialize the Bullet with the given position, colour, and velocity so that it can be reused.
+        """
+        self.x = x
+        self.y = y
+        self.vx = int(top_speed * math.cos(math.radians(angle)))
+        self.vy = int(top_speed * -math.sin(math.radians(angle)))
+        self.colour = colour
+        self.rect.topleft = 0, 0
 
     def update(self):
         """ (None) -> None
@@ -32,8 +43,22 @@ class Bullet(ShiftableObject):
         self.y += self.vy
         self.rect.center = self.x, self.y
 
+    def get_image(self):
+        """ (None) -> Surface
+        Return the image of a bullet with this colour and radius, drawing it the first time.
+        """
+        key = tuple(self.colour), self.radius
+        if key not in _images:
+            image = pygame.Surface((2 * self.radius + 1, 2 * self.radius + 1)).convert()
+            background = (255, 0, 255) if key[0] != (255, 0, 255) else (0, 0, 0)
+            image.fill(background)
+            pygame.draw.circle(image, self.colour, (self.radius, self.radius), self.radius)
+            image.set_colorkey(background, RLEACCEL)
+            _images[key] = image
+        return _images[key]
+
     def draw(self, surface):
         """ (Surface) -> None
         Draw the bullet onto the given display Surface.
         """
-        pygame.draw.circle(surface, self.colour, self.rect.center, self.radius)
\ No newline at end of file
+        surface.blit(self.get_image(), (self.rect.centerx - self.radius, self.rect.centery - self.radius))
\ No newline at end of file
@@ -0,0 +1,113 @@
+#####################################
+# Filename: bundle.py
+# Description: Binary bundle of decoded, cropped and scaled images that is
+#               memory-mapped at startup instead of decoding the PNG files
+#####################################
+
+import json, mmap, os, struct
+import pygame
+
+MAGIC = 'SPRB'
+VERSION = 1
+HEADER = struct.Struct('<4sII')     # Magic, version and length of the JSON index
+ALIGNMENT = 16                      # Every frame's pixels start at a multiple of this many bytes
+
+# Images stored in the bundle as they are, by filename
+BUNDLED_IMAGES = ('ammo.png', 'concrete.png', 'hyperion.png', 'keyblue.png', 'lock_blue.png', 'rockwall.png',
+                  'zombie.png')
+
+# Spritesheets stored in the bundle as (filename, images per row, images per column, scale factor)
+BUNDLED_SHEETS = (('zombiebasic.png', 4, 3, 1.0),
+                  ('food.png', 14, 8, 1.4),
+                  ('icons.png', 3, 2, 1.5),
+                  ('player.png', 2, 4, 1.0))
+
+
+def get_key(filename, num_in_row=1, num_in_col=1, scale=1.0):
+    """ (str, [int], [int], [float]) -> str
+    Return the name of the bundle entry for the given spritesheet. Plain images have one frame.
+    """
+    return '%s %dx%d %g' % (filename, num_in_row, num_in_col, scale)
+
+
+def write_bundle(path, entries):
+    """ (str, list) -> None
+    Write the given (key, source path, frames, width, height) entries to a bundle at the given path,
+    where frames is a list of Surfaces and (width, height) is the size of the source image.
+    """
+    index = {}
+    chunks = []
+    offset = 0
+    for key, source, frames, width, height in entries:
+        stat = os.stat(source)
+        records = []
+        for frame in frames:
+            pixels = pygame.image.tostring(frame, 'RGBA')
+            records.append((offset, frame.get_width(), frame.get_height()))
+            padding = -len(pixels) % ALIGNMENT
+            chunks.append(pixels + '\0' * padding)
+            offset += len(pixels) + padding
+        index[key] = {'source': os.path.basename(source), 'mtime': int(stat.st_mtime), 'size': stat.st_size,
+                      'width': width, 'height': height, 'frames': records}
+
+    data = json.dumps(index, sort_keys=True)
+    data += ' ' * (-(HEADER.size + len(data)) % ALIGNMENT)
+    with open(path, 'wb') as output:
+        output.write(HEADER.pack(MAGIC, VERSION, len(data)))
+        output.write(data)
+        for chunk in chunks:
+            output.write(chunk)
+
+
+class AssetBundle(object):
+    """ Read-only, memory-mapped bundle of images that were decoded ahead of time. """
+
+    def __init__(self, path, image_folder):
+        """ (str, str) -> AssetBundle
+        Open the bundle at the given path. Entries whose source image in the given folder
+        has changed since the bundle was written are ignored.
+        """
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Unsupported asset bundle ' + path)
+        self.data_start = HEADER.size + length
+        self.entries = {}       # Up-to-date entries keyed by name
+        self.stale = []         # Names of entries whose source image has changed
+        for key, entry in json.loads(self.map[HEADER.size:self.data_start]).items():
+            try:
+                stat = os.stat(os.path.join(image_folder, entry['source']))
+            except OSError:
+                stat = None
+            if stat is None or int(stat.st_mtime) != entry['mtime'] or stat.st_size != entry['size']:
+                self.stale.append(key)
+            else:
+                self.entries[key] = entry
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get_size(self, key):
+        """ (str) -> tuple
+        Return the (width, height) of the source image of the entry with the given name.
+        """
+        entry = self.entries[key]
+        return entry['width'], entry['height']
+
+    def get_num_frames(self, key):
+        """ (str) -> int
+        Return the number of frames in the entry with the given name.
+        """
+        return len(self.entries[key]['frames'])
+
+    def get_frame(self, key, i):
+        """ (str, int) -> Surface
+        Return a Surface with the pixels of the ith frame of the entry with the given name.
+        The Surface shares its pixels with the memory-mapped file until it is converted.
+        """
+        offset, width, height = self.entries[key]['frames'][i]
+        if width == 0 or height == 0:
+            return pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        start = self.data_start + offset
+        return pygame.image.frombuffer(buffer(self.map, start, 4 * width * height), (width, height), 'RGBA')
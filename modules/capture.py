@@ -0,0 +1,105 @@
+#####################################
+# Filename: capture.py
+# Description: Recording of the frames that the game shows, written to disk
+#               on a background thread
+#####################################
+
+import os, struct, threading, zlib, Queue
+from constants import *
+
+
+def encode_png(data, w, h):
+    """ (str, int, int) -> str
+    Return a PNG image of the given raw RGB pixels that are the given width and height. Unlike
+    pygame.image.save(), the compression lets other threads run while it works.
+    """
+    stride = w * 3
+    rows = b''.join(b'\x00' + data[y * stride:(y + 1) * stride] for y in xrange(h))
+
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows, CAPTURE_COMPRESSION)) + chunk(b'IEND', b''))
+
+
+class FrameRecorder(object):
+    """ Copies each frame into one of a fixed number of buffers and writes the buffers to disk on a
+    background thread, either as PNG images or as raw RGB frames. When the writer falls behind and
+    every buffer is waiting to be written, frames are dropped and counted instead of waiting. """
+
+    def __init__(self, directory, size, raw=False, buffers=CAPTURE_BUFFERS):
+        """ (str, tuple, [bool], [int]) -> FrameRecorder
+        Instantiate a recorder that writes frames of the given (width, height) into the given
+        directory, as raw RGB frames if requested (PNG images otherwise), copying them into the
+        given number of buffers.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.raw = raw
+        self.free = Queue.Queue()       # Buffers that are ready to be copied into
+        self.pending = Queue.Queue()    # (frame number, buffer) tuples waiting to be written
+        for i in range(buffers):
+            self.free.put(pygame.Surface(size, 0, 24))
+        self.frames = 0             # Frames captured so far, including the dropped ones
+        self.written = 0            # Frames written to disk
+        self.dropped = 0            # Frames dropped because every buffer was in use
+        self.error = None           # Exception that stopped the writer, if any
+        self.thread = threading.Thread(target=self.write_frames)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def capture(self, surface):
+        """ (Surface) -> None
+        Copy the given Surface into a free buffer and queue it to be written, or drop the frame
+        if there is no free buffer.
+        """
+        self.frames += 1
+        try:
+            buf = self.free.get_nowait()
+        except Queue.Empty:
+            self.dropped += 1
+            return
+        if buf.get_size() != surface.get_size():
+            buf = pygame.Surface(surface.get_size(), 0, 24)     # The render size changed
+        buf.blit(surface, (0, 0))
+        self.pending.put((self.frames, buf))
+
+    def write_frames(self):
+        """ (None) -> None
+        Write the queued frames until the recorder is stopped. Runs on the background thread.
+        """
+        while True:
+            frame, buf = self.pending.get()
+            if buf is None:
+                return
+            try:
+                if self.error is None:
+                    self.write_frame(frame, buf)
+                    self.written += 1
+            except Exception as error:
+                self.error = error      # Keep the game running, and report the error in stop()
+            self.free.put(buf)
+
+    def write_frame(self, frame, buf):
+        """ (int, Surface) -> None
+        Write the given buffer to disk as the frame with the given number.
+        """
+        w, h = buf.get_size()
+        data = pygame.image.tostring(buf, 'RGB')
+        if self.raw:
+            filename, data = 'frame%06d_%dx%d.rgb' % (frame, w, h), data
+        else:
+            filename, data = 'frame%06d.png' % frame, encode_png(data, w, h)
+        with open(os.path.join(self.directory, filename), 'wb') as f:
+            f.write(data)
+
+    def stop(self):
+        """ (None) -> None
+        Write the frames that are still queued, stop the writer thread and print a summary.
+        """
+        self.pending.put((0, None))
+        self.thread.join()
+        print('Capture: %d frames written, %d dropped to %s' % (self.written, self.dropped, self.directory))
+        if self.error is not None:
+            print('WARNING: Could not write frames: ' + str(self.error))
@@ -33,11 +33,14 @@ class Character(ShiftableObject):
         self.angle = 0
         self.aiming = False
         self.current_images = self.images_d
-        self.possible_directions = []
+        self.possible_directions = [RIGHT, UP, LEFT, DOWN]
+        self.region = -1            # ID of the room or path containing the character
         self.rect = self.get_rect()
         self.original_rect = self.rect.copy()
+        size = min(self.rect.width, self.rect.height)
+        self.hitbox = pygame.Rect(0, 0, size, size)     # Square used for wall collisions
 
-        self.text_font = load_font(SLEEK, 28)
+        self.text_font = None       # Font for labels, loaded the first time that one is drawn
 
     def normalize(self):
         """ (None) -> None
@@ -66,10 +69,9 @@ class Character(ShiftableObject):
         Correct missing rotated images by rotating them automatically.
         """
         self.images_u = images[:]
-        num = len(self.images_u)
-        self.images_d = [pygame.transform.rotate(self.images_u[i], 180) for i in range(num)]
-        self.images_l = [pygame.transform.rotate(self.images_u[i], 90) for i in range(num)]
-        self.images_r = [pygame.transform.rotate(self.images_u[i], -90) for i in range(num)]
+        self.images_d = [rotate_image(image, 180) for image in self.images_u]
+        self.images_l = [rotate_image(image, 90) for image in self.images_u]
+        self.images_r = [rotate_image(image, -90) for image in self.images_u]
 
     def move_to_target(self, x, y):
         """ (int, int) -> None
@@ -125,6 +127,14 @@ class Character(ShiftableObject):
         result.center = self.x, self.y
         return result
 
+    def get_hitbox(self):
+        """ (None) -> Rect
+        Return a square Rect centered on the character that does not change size as the
+        character animates or rotates. Used for collisions with walls.
+        """
+        self.hitbox.center = self.x, self.y
+        return self.hitbox
+
     def get_west(self):
         return self.rect.inflate(10, 10).midleft
 
@@ -196,7 +206,7 @@ class Player(Character):
         """
         self.aiming_image = load_image(image)
         if facing_up:
-            self.aiming_image = pygame.transform.rotate(self.aiming_image, -90)
+            self.aiming_image = rotate_image(self.aiming_image, -90)
 
     def get_rect(self):
         """ (None) -> Rect
@@ -222,24 +232,40 @@ class Player(Character):
 
 class Enemy(Character):
 
+    def __init__(self, x, y, speed, *images):
+        """ (int, int, int, [Surface]) -> Enemy
+        Instantiate an enemy that idles until it notices the player.
+        """
+        Character.__init__(self, x, y, speed, *images)
+        self.alerted = False        # True once the enemy has noticed the player
+
+    def get_image(self):
+        """ (None) -> Surface
+        Return the current image of the enemy, rotated to the nearest multiple of ROTATION_STEP degrees.
+        The rotated images are shared by every enemy.
+        """
+        angle = int(round(self.angle / ROTATION_STEP)) * ROTATION_STEP % 360
+        return rotate_image(self.images_r[int(self.image_counter) % len(self.images_l)], angle)
+
     def get_rect(self):
         """ (None) -> Rect
         Return a Rect that represents the bounding box of the player character.
         Overrides Character.get_rect().
         """
-        image = pygame.transform.rotate(self.images_r[int(self.image_counter) % len(self.images_l)], self.angle)
-        result = image.get_bounding_rect()
+        result = self.get_image().get_bounding_rect()
         result.center = self.x, self.y
         return result
 
-    def draw(self, surface):
-        """ (Surface) -> None
-        Draw the enemy onto the given Surface, rotated based on the current angle.
+    def draw(self, surface, mouse_pos=None):
+        """ (Surface, [tuple]) -> None
+        Draw the enemy onto the given Surface, rotated based on the current angle, and label it
+        with its health if the given mouse position is over it.
         Overrides Character.draw()
         """
-        image = pygame.transform.rotate(self.images_r[int(self.image_counter) % len(self.images_l)], self.angle)
-        surface.blit(image, self.rect)
-        if self.collides_with(pygame.mouse.get_pos()):
+        surface.blit(self.get_image(), self.rect)
+        if mouse_pos is not None and self.collides_with(mouse_pos):
+            if self.text_font is None:
+                self.text_font = load_font(SLEEK, 28)
             font_surface = self.text_font.render('Health: ' + str(self.health), 1, WHITE)
             font_rect = font_surface.get_rect()
             font_rect.center = self.rect.centerx, self.rect.top - 20
@@ -250,11 +276,21 @@ class Splatter(ShiftableObject):
 
     def __init__(self, x, y, image):
         """ (int, int, [Surface]) -> Splatter
-        Instantiate a blood splatter object.
+        Instantiate a blood splatter object. The image is shared, not copied.
         """
         ShiftableObject.__init__(self, x, y)
-        self.image = load_image(image)
-        self.rect = self.image.get_rect()
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, image)
+
+    def reset(self, x, y, image):
+        """ (int, int, Surface) -> None
+        Move the splatter to the given co-ordinates and give it the given image so that it can be reused.
+        """
+        self.x = x
+        self.y = y
+        self.image = get_image(image)
+        self.rect.size = self.image.get_size()
         self.rect.center = self.x, self.y
 
     def draw(self, surface):
@@ -0,0 +1,81 @@
+#####################################
+# Filename: collision.py
+# Description: Axis-separated collision resolution against level walls
+#####################################
+
+
+class CollisionResolver(object):
+    """ Moves boxes through the floor space of a level, one axis at a time. """
+
+    def __init__(self, rects):
+        """ (list) -> CollisionResolver
+        Instantiate a resolver for the floor space covered by the given list of room and
+        path Rects. The Rects must be the same objects that the level shifts.
+        """
+        self.rects = rects
+
+    def move(self, box, dx, dy):
+        """ (Rect, float, float) -> tuple
+        Return the part of the displacement (dx, dy) that the given box can make without
+        entering a wall, as a 2-tuple. Movement is resolved along x and then along y. A box
+        that already overlaps a wall is pushed back out.
+        """
+        dx = self.clip(box, dx, True)
+        dy = self.clip(box.move(dx, 0), dy, False)
+        return dx, dy
+
+    def clip(self, box, delta, horizontal):
+        """ (Rect, float, bool) -> float
+        Return the part of the given displacement along one axis that keeps the box on the floor.
+        """
+        if horizontal:
+            near, size, center, start, end = box.left, box.width, box.centerx, box.top, box.bottom
+            sweep = box.inflate(2 * abs(delta) + 2, 0)
+        else:
+            near, size, center, start, end = box.top, box.height, box.centery, box.left, box.right
+            sweep = box.inflate(0, 2 * abs(delta) + 2)
+        spans = []
+        for index in sweep.collidelistall(self.rects):
+            rect = self.rects[index]
+            if horizontal:
+                spans.append((rect.top, rect.bottom, rect.left, rect.right))
+            else:
+                spans.append((rect.left, rect.right, rect.top, rect.bottom))
+
+        # Cut the box into bands across the direction of movement wherever a Rect begins or ends,
+        # then find how far the floor under each band stretches around the center of the box.
+        cuts = set([start, end])
+        for first, last, low, high in spans:
+            if start < first < end: cuts.add(first)
+            if start < last < end: cuts.add(last)
+        cuts = sorted(cuts)
+        lowest, highest = None, None
+        for i in range(len(cuts) - 1):
+            band = sorted((low, high) for first, last, low, high in spans
+                          if first <= cuts[i] and last >= cuts[i + 1])
+            floor = self.get_span(band, center)
+            if floor is None:
+                continue
+            lowest = floor[0] if lowest is None else max(lowest, floor[0])
+            highest = floor[1] if highest is None else min(highest, floor[1])
+        if lowest is None:
+            return delta
+        return max(lowest, min(near + delta, highest - size)) - near
+
+    @staticmethod
+    def get_span(intervals, point):
+        """ (list, int) -> tuple
+        Merge the given sorted list of (start, end) intervals and return the merged interval
+        that contains the given point, or None if no interval contains it.
+        """
+        result = None
+        for low, high in intervals:
+            if result is not None and low <= result[1]:
+                result = result[0], max(result[1], high)
+            elif result is not None and result[0] <= point < result[1]:
+                return result
+            else:
+                result = low, high
+        if result is not None and result[0] <= point < result[1]:
+            return result
+        return None
@@ -34,10 +34,58 @@ SLOW_FPS = 30
 SMOOTH_FPS = 60
 UNL_FPS = 1000
 
+# ----- Display -----
+RENDER_SCALES = (1.0, 0.85, 0.7, 0.5)   # Fractions of the render resolution used by dynamic resolution
+
+# ----- Transitions -----
+TRANSITION_TIME = 500       # Milliseconds to fade out of a finished level, and to fade into the next one
+
+# ----- Capture -----
+CAPTURE_DIR = 'captures'    # Directory that recordings are written into, one subdirectory each
+CAPTURE_BUFFERS = 8         # Frames that can wait to be written before frames are dropped
+CAPTURE_KEY = K_F12         # Starts and stops recording
+CAPTURE_COMPRESSION = 1     # zlib level of recorded PNG images, from 1 (fastest) to 9 (smallest)
+
+# ----- Telemetry -----
+TELEMETRY_CAPACITY = 65536  # Events that can wait to be flushed before events are dropped
+TELEMETRY_FLUSH_INTERVAL = 1.0  # Seconds between flushes of the telemetry buffer
+TELEMETRY_HUNGER_INTERVAL = 60  # Frames between samples of the player's hunger
+
+# ----- Scheduling -----
+SCHEDULER_MAX_DELAY = 10    # Most frames that low-priority work can be put off for
+MAX_BLOOD = 25              # Most blood splatter kept in a level
+
+# ----- Events -----
+WAKE_EVENT = USEREVENT + 1  # Timer event that wakes up menus that are waiting for input
+MENU_WAKE_TIME = 500        # Longest time in milliseconds that a menu waits for input
+
 # ---- Fonts -----
 SLEEK = 'weblysleekuil.ttf'
 DIGITAL = 'DigitalDream.ttf'
 
+# ----- AI -----
+CHASE_DISTANCE = 40     # Number of grid cells that enemies will follow the player through
+LOD_RATES = ((900, 1), (1800, 3), (3000, 6))   # (Distance from player, frames between enemy updates)
+ROTATION_STEP = 5       # Enemies are drawn facing the nearest multiple of this many degrees
+CROWD_RADIUS = 60       # Distance within which chasing enemies keep away from each other
+CROWD_SEPARATION = 3.0  # Pixels per frame that an enemy is pushed away from a touching neighbour
+CROWD_COHESION = 0.5    # Pixels per frame that an enemy is pulled toward the center of its neighbours
+
+# ----- Visibility -----
+VISION_RADIUS = 14      # Number of grid cells that the player can see
+FOG_ALPHA = 128         # Opacity of the fog over unseen cells (128 has the fastest blits)
+
+# ----- Minimap -----
+MINIMAP_SIZE = 200      # Width or height of the minimap, whichever is larger
+MINIMAP_RANGE = 1200    # Enemies closer than this many pixels to the player are marked on the minimap
+MINIMAP_BACKGROUND = 20, 20, 20
+MINIMAP_FLOOR = 110, 110, 110
+
+# ----- Endless mode -----
+ENDLESS_LOAD_RADIUS = 1     # Number of chunks around the player's chunk to keep loaded
+ENDLESS_MAX_CHUNKS = 12     # Most chunks that can be loaded at once
+ENDLESS_MAX_ENEMIES = 4     # Most enemies generated in a single chunk
+
 # ----- Other -----
 LAST_LEVEL = 4
 HUNGER_LIMIT = 10
@@ -0,0 +1,73 @@
+#####################################
+# Filename: controls.py
+# Description: Snapshots of the keyboard, mouse and event queue that are taken
+#               once per frame and passed to everything that reacts to input
+#####################################
+
+from collections import namedtuple
+from constants import *
+from display import get_mouse_pos
+
+# Immutable state of the inputs during one frame. keys and mouse_buttons are indexed like
+# pygame.key.get_pressed() and pygame.mouse.get_pressed(), the *_pressed and *_released sets
+# hold the keys and mouse button indices that went down or up since the previous frame, and
+# events is the tuple of Pygame events taken from the queue during the frame.
+InputSnapshot = namedtuple('InputSnapshot', 'keys mouse_buttons mouse_pos keys_pressed keys_released '
+                                            'buttons_pressed buttons_released events')
+
+
+def create_snapshot(keys, mouse_buttons, mouse_pos, previous=None, events=()):
+    """ (sequence, tuple, tuple, [InputSnapshot], [tuple]) -> InputSnapshot
+    Return a snapshot of the given inputs. Mouse button presses and releases are found by comparing
+    with the given previous snapshot, and key presses and releases are taken from the given events.
+    """
+    old_buttons = previous.mouse_buttons if previous is not None else (0,) * len(mouse_buttons)
+    return InputSnapshot(keys, tuple(mouse_buttons), tuple(mouse_pos),
+                         frozenset(event.key for event in events if event.type == KEYDOWN),
+                         frozenset(event.key for event in events if event.type == KEYUP),
+                         frozenset(i for i, down in enumerate(mouse_buttons) if down and not old_buttons[i]),
+                         frozenset(i for i, down in enumerate(mouse_buttons) if old_buttons[i] and not down),
+                         tuple(events))
+
+
+NO_INPUT = create_snapshot((0,) * 512, (0, 0, 0), (0, 0))     # Snapshot with nothing pressed
+
+
+class InputState(object):
+    """ Polls Pygame for the inputs once per frame. """
+
+    def __init__(self):
+        """ (None) -> InputState
+        Instantiate an input poller with nothing pressed.
+        """
+        self.snapshot = NO_INPUT    # Snapshot taken during the last poll
+
+    def poll(self):
+        """ (None) -> InputSnapshot
+        Empty the event queue, read the keyboard and mouse, and return a snapshot of them.
+        Mouse motion is not queued between polls, since the game blocks it (see Game.__init__).
+        """
+        events = pygame.event.get()
+        self.snapshot = create_snapshot(pygame.key.get_pressed(), pygame.mouse.get_pressed(), get_mouse_pos(),
+                                        self.snapshot, events)
+        return self.snapshot
+
+    def wait(self, timeout=MENU_WAKE_TIME):
+        """ ([int]) -> InputSnapshot
+        Sleep until an event arrives, including mouse motion, or until the given number of
+        milliseconds pass. Then empty the event queue, read the keyboard and mouse, and return
+        a snapshot of them. Events that were blocked before waiting are blocked again afterwards.
+        """
+        blocked = [event_type for event_type in (MOUSEMOTION, MOUSEBUTTONUP, WAKE_EVENT)
+                   if pygame.event.get_blocked(event_type)]
+        if blocked:
+            pygame.event.set_allowed(blocked)
+        pygame.time.set_timer(WAKE_EVENT, timeout)
+        events = [pygame.event.wait()] + pygame.event.get()
+        pygame.time.set_timer(WAKE_EVENT, 0)
+        if blocked:
+            pygame.event.set_blocked(blocked)
+        events = [event for event in events if event.type != WAKE_EVENT]
+        self.snapshot = create_snapshot(pygame.key.get_pressed(), pygame.mouse.get_pressed(), get_mouse_pos(),
+                                        self.snapshot, events)
+        return self.snapshot
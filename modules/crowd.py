@@ -0,0 +1,91 @@
+#####################################
+# Filename: crowd.py
+# Description: Crowd steering that keeps chasing enemies from stacking on top of
+#               each other, with neighbours found through a uniform grid
+#####################################
+
+import math
+from constants import *
+
+
+class CrowdSteering(object):
+    """ Separation and cohesion forces for a crowd of enemies. The enemies are bucketed into a
+    uniform grid of cells as wide as the neighbourhood radius once per frame, so each enemy
+    only compares itself with the enemies in the 3x3 block of cells around it. """
+
+    def __init__(self, radius=CROWD_RADIUS, separation=CROWD_SEPARATION, cohesion=CROWD_COHESION):
+        """ ([int], [float], [float]) -> CrowdSteering
+        Instantiate steering for enemies that react to the enemies within the given radius,
+        pushing away from them with the given strength and pulling toward their center with
+        the other given strength, both in pixels per frame.
+        """
+        self.radius = radius
+        self.separation = separation
+        self.cohesion = cohesion
+        self.xs = []                # Co-ordinates of the enemies, in the order that they were given
+        self.ys = []
+        self.cells = {}             # Indices of the enemies keyed by (column, row) of their cell
+        self.comparisons = 0        # Pairs of enemies compared during the last frame
+
+    def build(self, enemies):
+        """ (list) -> None
+        Bucket the given enemies into the grid, replacing the enemies of the last frame.
+        """
+        size = self.radius
+        self.xs = [enemy.x for enemy in enemies]
+        self.ys = [enemy.y for enemy in enemies]
+        self.cells = cells = {}
+        for i in xrange(len(enemies)):
+            cell = int(self.xs[i]) // size, int(self.ys[i]) // size
+            if cell in cells:
+                cells[cell].append(i)
+            else:
+                cells[cell] = [i]
+
+    def steer(self, enemies, active):
+        """ (list, list) -> list
+        Rebuild the grid from the given enemies and return a list with the (x, y) steering force
+        of each of them. Only the enemies whose entry in the given list of flags is True are
+        steered, and the rest get (0, 0), but every enemy pushes the enemies around it.
+        """
+        forces = [(0, 0)] * len(enemies)
+        self.comparisons = 0
+        if not any(active):
+            return forces
+        self.build(enemies)
+        xs, ys, cells = self.xs, self.ys, self.cells
+        size, radius_squared = self.radius, self.radius ** 2
+        separation, cohesion = self.separation, self.cohesion
+        comparisons = 0
+        for i in xrange(len(enemies)):
+            if not active[i]:
+                continue
+            x, y = xs[i], ys[i]
+            col, row = int(x) // size, int(y) // size
+            push_x = push_y = sum_x = sum_y = 0.0
+            count = 0
+            for cell in ((col - 1, row - 1), (col, row - 1), (col + 1, row - 1),
+                         (col - 1, row), (col, row), (col + 1, row),
+                         (col - 1, row + 1), (col, row + 1), (col + 1, row + 1)):
+                for j in cells.get(cell, ()):
+                    dx, dy = x - xs[j], y - ys[j]
+                    distance_squared = dx * dx + dy * dy
+                    comparisons += 1
+                    if j == i or distance_squared >= radius_squared:
+                        continue
+                    count += 1
+                    sum_x += xs[j]
+                    sum_y += ys[j]
+                    if distance_squared == 0:
+                        dx, dy, distance_squared = (1, 0, 1) if i < j else (-1, 0, 1)
+                    # Push harder the closer the neighbour is, from 0 at the radius to 1 when touching.
+                    distance = math.sqrt(distance_squared)
+                    weight = (size - distance) / (size * distance)
+                    push_x += dx * weight
+                    push_y += dy * weight
+            if count:
+                force_x = separation * push_x + cohesion * (sum_x / count - x) / size
+                force_y = separation * push_y + cohesion * (sum_y / count - y) / size
+                forces[i] = force_x, force_y
+        self.comparisons = comparisons
+        return forces
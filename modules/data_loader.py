@@ -6,6 +6,15 @@
 #####################################
 
 import pygame, os
+from bundle import AssetBundle, get_key
+
+BUNDLE_FILENAME = 'sprites.bundle'      # Bundle of pre-decoded images in the images folder
+
+_fonts = {}     # Fonts that have already been loaded, keyed by (filename, size)
+_images = {}    # Images that have already been loaded, keyed by (filename, transparency)
+_rotations = {} # Rotated images, keyed by (original Surface, angle)
+_bundle = None          # Opened AssetBundle, or None if there is no bundle
+_bundle_checked = False # Whether the images folder has been checked for a bundle yet
 
 def _get_filepath(folder, filename):
     """ (str, str) -> str
@@ -14,17 +23,63 @@ def _get_filepath(folder, filename):
     root = os.path.dirname(os.path.dirname(__file__))
     return os.path.join(root, folder, filename)
 
+def get_bundle():
+    """ (None) -> AssetBundle
+    Return the bundle of pre-decoded images, or None if it has not been built.
+    The bundle is opened the first time that this is called.
+    """
+    global _bundle, _bundle_checked
+    if not _bundle_checked:
+        _bundle_checked = True
+        path = _get_filepath('images', BUNDLE_FILENAME)
+        try:
+            if os.path.exists(path):
+                _bundle = AssetBundle(path, _get_filepath('images', ''))
+        except (IOError, ValueError) as error:
+            print('WARNING: Could not open asset bundle: ' + str(error))
+        if _bundle is not None and _bundle.stale:
+            print('WARNING: Asset bundle is out of date for ' + ', '.join(sorted(_bundle.stale)) +
+                  '. Run bundle_assets.py to rebuild it.')
+    return _bundle
+
 def load_image(filename, transparency=True):
     """ (str, [bool]) -> Surface
     Return a pygame Surface object representing an image with the given filename.
+    Images in the asset bundle are used without decoding the image file, and each file is
+    only loaded once, so the returned Surface is shared and must not be drawn on.
     """
-    if isinstance(filename, str):
+    if isinstance(filename, str) and (filename, transparency) in _images:
+        return _images[filename, transparency]
+    bundle = get_bundle() if isinstance(filename, str) else None
+    if bundle is not None and get_key(filename) in bundle:
+        result = bundle.get_frame(get_key(filename), 0)
+    elif isinstance(filename, str):
         result = pygame.image.load(_get_filepath('images', filename))
     else:
         result = filename
-    if transparency:
-        return result.convert_alpha()
-    return result.convert()
+    result = result.convert_alpha() if transparency else result.convert()
+    if isinstance(filename, str):
+        _images[filename, transparency] = result
+    return result
+
+def get_image(image):
+    """ (Surface-or-str) -> Surface
+    Return the given Surface as it is, or the image with the given filename.
+    Used by objects that are handed images that were already loaded.
+    """
+    if isinstance(image, str):
+        return load_image(image)
+    return image
+
+def rotate_image(image, angle):
+    """ (Surface, float) -> Surface
+    Return the given image rotated counterclockwise by the given number of degrees.
+    Rotations are only computed once per image and angle, so the returned Surface is shared
+    and the angle should come from a small set of values.
+    """
+    if (image, angle) not in _rotations:
+        _rotations[image, angle] = pygame.transform.rotate(image, angle)
+    return _rotations[image, angle]
 
 def load_sound(filename):
     """ (str) -> Sound
@@ -34,9 +89,18 @@ def load_sound(filename):
 
 def load_font(filename, size):
     """ (str) -> Font
-    Return a new Font object based on the given size and filename.
+    Return a Font object based on the given size and filename.
+    Fonts are only loaded from disk the first time that they are requested.
+    """
+    if (filename, size) not in _fonts:
+        _fonts[filename, size] = pygame.font.Font(_get_filepath('fonts', filename), size)
+    return _fonts[filename, size]
+
+def get_image_path(filename):
+    """ (str) -> str
+    Return the exact path of the image with the given filename. Does not load the image.
     """
-    return pygame.font.Font(_get_filepath('fonts', filename), size)
+    return _get_filepath('images', filename)
 
 def get_music_path(filename):
     """ (str) -> str
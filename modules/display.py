@@ -0,0 +1,105 @@
+#####################################
+# Filename: display.py
+# Description: Game window that is drawn at a fixed internal resolution and
+#               scaled up to the size of the screen once per frame
+#####################################
+
+from constants import *
+
+_mouse_scale = 1.0, 1.0     # Render Surface pixels per window pixel, horizontally and vertically
+
+
+def get_mouse_pos():
+    """ (None) -> tuple
+    Return the position of the mouse in the co-ordinates of the render Surface.
+    """
+    x, y = pygame.mouse.get_pos()
+    return int(x * _mouse_scale[0]), int(y * _mouse_scale[1])
+
+
+class Display(object):
+    """ Window with a render Surface that everything is drawn onto. If the render Surface is smaller
+    than the window, it is scaled to fill the window when the frame is presented. """
+
+    def __init__(self, window_size, flags=0, render_size=None, smooth=False):
+        """ (tuple, [int], [tuple], [bool]) -> Display
+        Open a window of the given size with the given flags, drawn at the given render size
+        (the window size by default). Smooth scaling is only used on 24 and 32-bit displays.
+        """
+        self.window = pygame.display.set_mode(window_size, flags)
+        self.window.set_alpha(None)     # Disable display transparency to boost FPS
+        self.smooth = smooth and self.window.get_bitsize() >= 24
+        self.surface = None             # Surface that each frame is drawn onto
+        self.set_render_size(render_size or window_size)
+
+    def get_render_size(self):
+        """ (None) -> tuple
+        Return the (width, height) of the render Surface.
+        """
+        return self.surface.get_size()
+
+    def set_render_size(self, size):
+        """ (tuple) -> None
+        Draw future frames at the given (width, height). Clears the render Surface.
+        """
+        global _mouse_scale
+        size = int(size[0]), int(size[1])
+        if size == self.window.get_size():
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface(size, 0, self.window)
+        _mouse_scale = float(size[0]) / self.window.get_width(), float(size[1]) / self.window.get_height()
+
+    def present(self):
+        """ (None) -> None
+        Scale the render Surface to the window if necessary and show the frame.
+        """
+        if self.surface is not self.window:
+            if self.smooth:
+                pygame.transform.smoothscale(self.surface, self.window.get_size(), self.window)
+            else:
+                pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+        pygame.display.flip()
+
+
+class DynamicResolution(object):
+    """ Lowers the render resolution while frames take longer than the frame budget,
+    and raises it again once frames are comfortably within the budget. """
+
+    def __init__(self, budget, scales=RENDER_SCALES, patience=30):
+        """ (float, [tuple], [int]) -> DynamicResolution
+        Instantiate a controller for the given frame budget in milliseconds that picks one of the
+        given scale factors (largest first). The resolution is lowered after the average frame
+        time has been over budget for the given number of frames, and raised after it has been
+        under half of the budget for four times as long.
+        """
+        self.budget = float(budget)
+        self.scales = scales
+        self.index = 0              # Index of the current scale factor
+        self.average = 0.0          # Moving average of the frame time in milliseconds
+        self.slow_frames = 0        # Frames in a row with the average over budget
+        self.fast_frames = 0        # Frames in a row with the average under half of the budget
+        self.patience = patience
+
+    def get_scale(self):
+        """ (None) -> float
+        Return the current scale factor of the render resolution.
+        """
+        return self.scales[self.index]
+
+    def update(self, frame_time):
+        """ (float) -> bool
+        Record the time in milliseconds spent on the last frame. Return True if the scale factor
+        changed, False otherwise.
+        """
+        self.average += 0.1 * (frame_time - self.average)
+        self.slow_frames = self.slow_frames + 1 if self.average > self.budget else 0
+        self.fast_frames = self.fast_frames + 1 if self.average < 0.5 * self.budget else 0
+        if self.slow_frames >= self.patience and self.index < len(self.scales) - 1:
+            self.index += 1
+        elif self.fast_frames >= 4 * self.patience and self.index > 0:
+            self.index -= 1
+        else:
+            return False
+        self.slow_frames = self.fast_frames = 0
+        return True
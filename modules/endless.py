@@ -0,0 +1,262 @@
+#####################################
+# Filename: endless.py
+# Description: Endless survival level that is streamed in chunks around the player
+#####################################
+
+import time
+from random import Random, randint
+from constants import *
+from controls import NO_INPUT
+from entities import *
+from geometry import LevelGeometry
+from grid import LevelGrid
+from level import Level
+from minimap import Minimap
+
+
+class Chunk(object):
+    """ Square piece of the endless world with its own room and hallways. """
+
+    def __init__(self, cx, cy):
+        """ (int, int) -> Chunk
+        Instantiate an empty chunk at the given chunk co-ordinates.
+        """
+        self.cx = cx
+        self.cy = cy
+        self.rooms = []             # List of room Rects (on-screen co-ordinates)
+        self.paths = []             # List of hallway Rects (on-screen co-ordinates)
+        self.geometry = None        # LevelGeometry of the part of the level inside the chunk
+        self.wall_surfaces = []     # Surfaces in the same order as geometry.walls and geometry.floors
+        self.floor_surfaces = []
+        self.grid = None            # LevelGrid over the chunk
+
+
+class EndlessLevel(Level):
+    """ Level without an exit that generates chunks as the player approaches them and drops
+    the chunks that the player leaves behind. """
+
+    def __init__(self, path_img, wall_img, seed=None):
+        """ (str, str, [int]) -> EndlessLevel
+        Instantiate a blank endless level. Levels with the same seed have the same layout.
+        """
+        Level.__init__(self, path_img, wall_img)
+        self.seed = randint(0, 1 << 30) if seed is None else seed
+        self.chunk_size = 6 * self.path_width      # Width and height of each chunk (24 grid cells)
+        self.chunks = {}                            # Loaded chunks keyed by chunk co-ordinates
+        self.scroll_x = 0                           # On-screen co-ordinates of the world origin
+        self.scroll_y = 0
+        self.generation_times = []                  # Seconds spent streaming chunks in recent frames
+        self.wall_texture = None                    # Tiled Surfaces shared by every chunk
+        self.floor_texture = None
+
+    def generate(self, game=None):
+        """ (None, Game) -> None
+        Generate the chunks around the starting point with the given Game instance.
+        Overrides Level.generate().
+        """
+        if game is not None:
+            self.screen_w = game.screen_w
+            self.screen_h = game.screen_h
+        self.scroll_x = self.screen_w // 2 - self.chunk_size // 2
+        self.scroll_y = self.screen_h // 2 - self.chunk_size // 2
+        self.chunks = {}
+        self.entities.remove_all(ENEMY)
+        self.entities.remove_all(ITEM)
+        self.entities.remove_all(ENDING)
+        self.splatter_pool.release_all(self.entities.remove_all(BLOOD))
+        self.bullet_pool.release_all(self.entities.remove_all(BULLET))
+        self.lock = self.key = None
+        self.wall_texture = self.create_texture(self.wall_image)
+        self.floor_texture = self.create_texture(self.path_image)
+        self.initialize_player()
+        self.starving_frames = 0
+        self.load_sprites()
+        while self.stream_chunks():
+            pass
+
+    def create_texture(self, image):
+        """ (Surface) -> Surface
+        Return a Surface tiled with the given image that is one tile larger than a chunk, so that
+        it holds every chunk-sized piece of the tiling.
+        """
+        texture = pygame.Surface((self.chunk_size + image.get_width(), self.chunk_size + image.get_height()))
+        texture = texture.convert()
+        self.tile(image, texture, texture.get_rect())
+        return texture
+
+    def create_output_surface(self, image, rect):
+        """ (Surface, Rect) -> Surface
+        Return a Surface the size of the given Rect (at most a chunk wide and tall) that is tiled
+        with the given image, lined up with the world origin. The Surface shares the pixels of the
+        tiled texture, so loading a chunk allocates no new pixel memory.
+        Overrides Level.create_output_surface().
+        """
+        texture = self.wall_texture if image is self.wall_image else self.floor_texture
+        x = (rect.left - self.scroll_x) % image.get_width()
+        y = (rect.top - self.scroll_y) % image.get_height()
+        return texture.subsurface(pygame.Rect((x, y), rect.size))
+
+    def is_complete(self):
+        """ (None) -> bool
+        Return False, since an endless level never ends.
+        Overrides Level.is_complete().
+        """
+        return False
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Shift the entire level by the given increments and keep track of the world origin.
+        Overrides Level.shift().
+        """
+        self.scroll_x += dx
+        self.scroll_y += dy
+        for chunk in self.chunks.values():
+            chunk.grid.shift(dx, dy)
+        Level.shift(self, dx, dy)
+
+    def get_chunk_rect(self, cx, cy):
+        """ (int, int) -> Rect
+        Return the on-screen boundaries of the chunk at the given chunk co-ordinates.
+        """
+        return pygame.Rect(cx * self.chunk_size + self.scroll_x, cy * self.chunk_size + self.scroll_y,
+                           self.chunk_size, self.chunk_size)
+
+    def get_player_chunk(self):
+        """ (None) -> tuple
+        Return the chunk co-ordinates of the chunk that contains the player.
+        """
+        return (int(self.player.x - self.scroll_x) // self.chunk_size,
+                int(self.player.y - self.scroll_y) // self.chunk_size)
+
+    def has_south_hallway(self, cx, cy):
+        """ (int, int) -> bool
+        Return True if the chunk at the given chunk co-ordinates connects to the chunk below it.
+        Every third column is always connected so that no part of the world is cut off.
+        """
+        return cx % 3 == 0 or Random(hash((self.seed, cx, cy, DOWN))).random() < 0.4
+
+    def stream_chunks(self):
+        """ (None) -> bool
+        Drop the chunks that are out of range of the player and generate at most one missing
+        chunk. Return True if a chunk was generated, False if all chunks in range are loaded.
+        """
+        start = time.time()
+        px, py = self.get_player_chunk()
+        radius = ENDLESS_LOAD_RADIUS
+        changed = False
+        for key in list(self.chunks):
+            if max(abs(key[0] - px), abs(key[1] - py)) > radius + 1:
+                del self.chunks[key]
+                changed = True
+
+        # Load the closest missing chunk, making room for it under the chunk limit first.
+        missing = [(max(abs(cx - px), abs(cy - py)), cx, cy)
+                   for cx in range(px - radius, px + radius + 1)
+                   for cy in range(py - radius, py + radius + 1) if (cx, cy) not in self.chunks]
+        if missing:
+            distance, cx, cy = min(missing)
+            while len(self.chunks) >= ENDLESS_MAX_CHUNKS:
+                del self.chunks[max(self.chunks, key=lambda k: max(abs(k[0] - px), abs(k[1] - py)))]
+            self.chunks[cx, cy] = self.generate_chunk(cx, cy)
+            self.level_num = max(self.level_num, 1 + max(abs(cx), abs(cy)) // 2)
+
+        if changed or missing:
+            self.rebuild()
+            self.generation_times = self.generation_times[-19:] + [time.time() - start]
+        return bool(missing)
+
+    def generate_chunk(self, cx, cy):
+        """ (int, int) -> Chunk
+        Generate the room, hallways, items and enemies of the chunk at the given chunk co-ordinates.
+        The layout depends only on the seed and the chunk co-ordinates.
+        """
+        rng = Random(hash((self.seed, cx, cy)))
+        chunk = Chunk(cx, cy)
+        bounds = self.get_chunk_rect(cx, cy)
+        half = self.path_width // 2
+
+        # Every chunk has a room that covers the hallways crossing the center of the chunk.
+        width = rng.randint(2 * self.path_width, 4 * self.path_width)
+        height = rng.randint(2 * self.path_width, 4 * self.path_width)
+        room = pygame.Rect(0, 0, width, height)
+        room.center = bounds.center
+        if (cx, cy) != (0, 0):
+            limit_x = min((width - self.path_width) // 2, (self.chunk_size - width) // 2 - self.wall_width)
+            limit_y = min((height - self.path_width) // 2, (self.chunk_size - height) // 2 - self.wall_width)
+            room.move_ip(rng.randint(-limit_x, limit_x), rng.randint(-limit_y, limit_y))
+        chunk.rooms.append(room)
+
+        # Hallways run across every chunk and down through some of them.
+        chunk.paths.append(pygame.Rect(bounds.left, bounds.centery - half, self.chunk_size, self.path_width))
+        if self.has_south_hallway(cx, cy - 1):
+            chunk.paths.append(pygame.Rect(bounds.centerx - half, bounds.top, self.path_width,
+                                           self.chunk_size // 2))
+        if self.has_south_hallway(cx, cy):
+            chunk.paths.append(pygame.Rect(bounds.centerx - half, bounds.centery, self.path_width,
+                                           self.chunk_size // 2))
+
+        # Stock the chunk with items, and with more enemies the further it is from the start.
+        if (cx, cy) != (0, 0):
+            for i in range(min(ENDLESS_MAX_ENEMIES, 1 + max(abs(cx), abs(cy)) // 2)):
+                self.spawn_enemy(room.centerx + rng.randint(-room.width // 4, room.width // 4),
+                                 room.centery + rng.randint(-room.height // 4, room.height // 4))
+        for i in range(rng.randint(0, 2)):
+            self.add_item(rng.choice(self.food_images), 'food', chunk.rooms + chunk.paths)
+        if rng.random() < 0.3:
+            self.add_item(self.health_pack_image, 'health', chunk.rooms)
+        if rng.random() < 0.5:
+            self.add_item(self.ammo_pack_image, 'ammo', chunk.rooms)
+        self.build_chunk(chunk, bounds)
+        return chunk
+
+    def build_chunk(self, chunk, bounds):
+        """ (Chunk, Rect) -> None
+        Split the rooms and hallways of the given chunk into disjoint floor and wall Rects inside
+        its given boundaries, cache their Surfaces, and lay a navigation grid over the chunk. None
+        of these depend on the other chunks, so they are built once when the chunk is loaded.
+        """
+        rects = chunk.paths + chunk.rooms
+        chunk.geometry = LevelGeometry(rects, self.wall_width, bounds)
+        chunk.wall_surfaces = [self.create_output_surface(self.wall_image, rect) for rect in chunk.geometry.walls]
+        chunk.floor_surfaces = [self.create_output_surface(self.path_image, rect) for rect in chunk.geometry.floors]
+        chunk.grid = LevelGrid(rects, self.path_width // 4, bounds)
+
+    def rebuild(self):
+        """ (None) -> None
+        Gather the rooms, hallways, floor and wall Rects and Surfaces of every loaded chunk, drop
+        the objects that are no longer inside a loaded chunk, and rebuild the navigation structures
+        from the grids of the chunks.
+        """
+        self.paths, self.rooms = [], []
+        self.geometry = LevelGeometry([], self.wall_width)
+        self.wall_surfaces, self.floor_surfaces = [], []
+        for chunk in self.chunks.values():
+            self.paths.extend(chunk.paths)
+            self.rooms.extend(chunk.rooms)
+            self.geometry.extend(chunk.geometry)
+            self.wall_surfaces.extend(chunk.wall_surfaces)
+            self.floor_surfaces.extend(chunk.floor_surfaces)
+        self.minimap = Minimap(self.paths + self.rooms)
+
+        bounds = [self.get_chunk_rect(cx, cy) for cx, cy in self.chunks]
+        for thing in [thing for thing in self.enemies + self.items if thing.rect.collidelist(bounds) == -1]:
+            self.entities.remove(thing)
+        self.build_navigation()
+
+    def create_grid(self):
+        """ (None) -> LevelGrid
+        Return a navigation grid over the loaded chunks that is pieced together from their grids.
+        Overrides Level.create_grid().
+        """
+        cxs = [cx for cx, cy in self.chunks]
+        cys = [cy for cx, cy in self.chunks]
+        bounds = self.get_chunk_rect(min(cxs), min(cys)).union(self.get_chunk_rect(max(cxs), max(cys)))
+        return LevelGrid([], self.path_width // 4, bounds, [chunk.grid for chunk in self.chunks.values()])
+
+    def update(self, inputs=NO_INPUT):
+        """ ([InputSnapshot]) -> None
+        Stream chunks in and out around the player, then update the level with the given inputs.
+        Overrides Level.update().
+        """
+        self.stream_chunks()
+        Level.update(self, inputs)
@@ -0,0 +1,173 @@
+#####################################
+# Filename: entities.py
+# Description: Registry of level entities that stores each component densely,
+#               and the system passes that run over those components
+#####################################
+
+from render import *
+
+# ----- Components -----
+# Kinds of entity, which are components too, so that each kind can be iterated on its own.
+ENEMY = 'enemy'
+ITEM = 'item'
+BULLET = 'bullet'
+BLOOD = 'blood'
+ENDING = 'ending'           # Lock or key
+PLAYER = 'player'
+FOG = 'fog'
+
+# Behaviour that entities of different kinds have in common. RENDER[layer] is the component
+# of the entities that are drawn on the given render layer.
+SHIFT = 'shift'             # Moves with the level, see shift_system()
+UPDATE = 'update'           # Updated once per frame, see update_system()
+PICKUP = 'pickup'           # Collected when the player touches it
+FOGGED = 'fogged'           # Only drawn inside the player's field of view
+RENDER = tuple('render %d' % layer for layer in range(NUM_LAYERS))
+
+# Components that every entity of each kind has
+KIND_COMPONENTS = {
+    ENEMY: (SHIFT, FOGGED, RENDER[ENEMY_LAYER]),
+    ITEM: (SHIFT, PICKUP, RENDER[ITEM_LAYER]),      # Items are static, see Level.update_items()
+    BULLET: (SHIFT, RENDER[BULLET_LAYER]),
+    BLOOD: (SHIFT, RENDER[BLOOD_LAYER]),
+    ENDING: (SHIFT, UPDATE, RENDER[ITEM_LAYER]),
+    PLAYER: (RENDER[PLAYER_LAYER],),
+    FOG: (SHIFT, UPDATE, RENDER[FOG_LAYER]),
+}
+
+
+class Registry(object):
+    """ Keeps the entities of a level in a dense list per component. Adding or removing an entity
+    updates every list it belongs to, so systems iterate over a component's list directly
+    instead of building a new list every frame. """
+
+    def __init__(self):
+        """ (None) -> Registry
+        Instantiate an empty registry.
+        """
+        self.stores = {}            # Dense lists of entities keyed by component
+        self.indices = {}           # Index of each entity in the list, keyed by component
+        self.components = {}        # Components of each entity
+        self.hashes = {}            # SpatialHashes that hold the entities of each component
+
+    def add_hash(self, component, spatial_hash):
+        """ (str, SpatialHash) -> None
+        Keep the entities with the given component in the given spatial hash from now on. The
+        entities must still update the hash themselves when they move.
+        """
+        self.hashes.setdefault(component, []).append(spatial_hash)
+        for entity in self.get(component):
+            spatial_hash.insert(entity)
+
+    def get(self, component):
+        """ (str) -> list
+        Return the list of entities that have the given component, in the order they were added.
+        The list belongs to the registry and must not be modified.
+        """
+        if component not in self.stores:
+            self.stores[component] = []
+            self.indices[component] = {}
+        return self.stores[component]
+
+    def add(self, entity, kind, *components):
+        """ (object, str, ...) -> object
+        Add the given entity with the components of the given kind of entity, and any other given
+        components, and return it.
+        """
+        components = (kind,) + KIND_COMPONENTS.get(kind, ()) + components
+        self.components[entity] = components
+        for component in components:
+            store = self.get(component)
+            self.indices[component][entity] = len(store)
+            store.append(entity)
+            for spatial_hash in self.hashes.get(component, ()):
+                spatial_hash.insert(entity)
+        return entity
+
+    def remove(self, entity):
+        """ (object) -> None
+        Remove the given entity from every component that it has. The other entities keep
+        their order.
+        """
+        for component in self.components.pop(entity, ()):
+            for spatial_hash in self.hashes.get(component, ()):
+                spatial_hash.remove(entity)
+            store, indices = self.stores[component], self.indices[component]
+            index = indices.pop(entity)
+            del store[index]
+            for i in xrange(index, len(store)):
+                indices[store[i]] = i
+
+    def remove_all(self, component):
+        """ (str) -> list
+        Remove every entity that has the given component and return them in a list.
+        """
+        entities = list(self.get(component))
+        removed = set(entities)
+        touched = set()
+        for entity in entities:
+            touched.update(self.components.pop(entity))
+        for other in touched:
+            for spatial_hash in self.hashes.get(other, ()):
+                for entity in entities:
+                    spatial_hash.remove(entity)
+            store, indices = self.stores[other], self.indices[other]
+            store[:] = [entity for entity in store if entity not in removed]
+            indices.clear()
+            for i, entity in enumerate(store):
+                indices[entity] = i
+        return entities
+
+    def has(self, entity, component=None):
+        """ (object, [str]) -> bool
+        Return True if the given entity has the given component (or is in the registry at all),
+        False otherwise.
+        """
+        if component is None:
+            return entity in self.components
+        return entity in self.indices.get(component, ())
+
+
+def shift_system(registry, dx, dy):
+    """ (Registry, int, int) -> None
+    Shift every entity that moves with the level by the given increments.
+    """
+    for entity in registry.get(SHIFT):
+        entity.shift(dx, dy)
+
+
+def update_system(registry):
+    """ (Registry) -> None
+    Update every entity that is updated once per frame.
+    """
+    for entity in registry.get(UPDATE):
+        entity.update()
+
+
+def collision_system(registry, component, rect):
+    """ (Registry, str, Rect) -> list
+    Return a list of the entities with the given component that collide with the given Rect.
+    """
+    return [entity for entity in registry.get(component) if rect.colliderect(entity.rect)]
+
+
+def render_system(registry, target, screen_rect, mouse_pos=None, queue=None, field_of_view=None):
+    """ (Registry, Surface, Rect, [tuple], [RenderQueue], [FieldOfView]) -> None
+    Draw every entity that overlaps the given screen Rect onto the given target, from the bottom
+    render layer up. Enemies are labelled when the given mouse position is over them. When a
+    render queue is given, the target must be that queue and each layer is queued separately.
+    When a field of view is given, fogged entities outside of it are not drawn.
+    """
+    fogged = registry.indices.get(FOGGED, ()) if field_of_view is not None else ()
+    for layer in range(NUM_LAYERS):
+        if queue is not None:
+            queue.layer = layer
+        for entity in registry.get(RENDER[layer]):
+            if not entity.rect.colliderect(screen_rect):
+                continue
+            if entity in fogged and not field_of_view.is_visible(entity.x, entity.y):
+                continue
+            if layer == ENEMY_LAYER:
+                entity.draw(target, mouse_pos)
+            else:
+                entity.draw(target)
@@ -5,22 +5,38 @@
 # Description: Main Game class for Supremacy
 #####################################
 
-import sys
+import os, sys, time
+from capture import FrameRecorder
 from constants import *
+from controls import InputState
 from data_loader import *
+from display import Display, DynamicResolution
 from level import Level
-from gui import Button, Stripe
+from endless import EndlessLevel
+from gui import Button, Label, Menu, Picture, Stripe
+from scheduler import FrameScheduler
+from tasks import BackgroundTask
+from telemetry import Telemetry, NO_TELEMETRY
+from timing import PhaseTimer
+from transition import Transition
 
 
 class Game(object):
 
-    def __init__(self, fps):
-        """ (int) -> Game
-        Instantiate a Game object with the given desired framerate.
+    def __init__(self, fps, render_size=None, dynamic_resolution=False, smooth=False, raw_capture=False,
+                 telemetry_path=None):
+        """ (int, [tuple], [bool], [bool], [bool], [str]) -> Game
+        Instantiate a Game object with the given desired framerate. The game is drawn at the given
+        render size (the screen size by default) and scaled up to the screen, smoothly if requested.
+        With dynamic resolution, the render size is lowered while frames take too long. Recordings
+        are written as raw RGB frames if requested, and as PNG images otherwise. Gameplay events
+        are logged to the given telemetry path, if any.
         """
 
         # ----- Initialization -----
-        pygame.init()                   # Initialize the Pygame package
+        self.startup = PhaseTimer('Startup')    # Timings of the cold-start phases
+        pygame.display.init()                   # Only initialize the Pygame subsystems needed right away
+        pygame.font.init()
 
         # ----- FPS + Clock -----
         self.desired_fps = fps                  # Target framerate in frames per second
@@ -28,29 +44,57 @@ class Game(object):
         self.measured_fps = 0                   # Actual FPS
 
         # ----- Display -----
-        self.screen_w = pygame.display.list_modes()[0][0]        # Screen width is the user's screen's width
-        self.screen_h = pygame.display.list_modes()[0][1]        # Screen height is the user's screen's height
         self.flags = HWACCEL | RLEACCEL | ASYNCBLIT | FULLSCREEN # Accelerated fullscreen flags
-        self.display_surf = pygame.display.set_mode((self.screen_w, self.screen_h), self.flags)
-        self.display_surf.set_alpha(None)                        # Disable display transparency to boost FPS
+        native_size = pygame.display.list_modes()[0]             # Largest fullscreen resolution
+        self.render_size = render_size or native_size            # Resolution that the game is drawn at
+        self.display = Display(native_size, self.flags, self.render_size, smooth)
+        self.display_surf = self.display.surface                 # Surface that everything is drawn onto
+        self.screen_w, self.screen_h = self.display.get_render_size()
+        self.resolution = None                                   # DynamicResolution controller, if enabled
+        if dynamic_resolution:
+            self.resolution = DynamicResolution(1000.0 / fps)
         pygame.display.set_caption(TITLE + ' by ' + PROGRAMMER)  # Set the screen caption (just for fun)
+        self.startup.mark('display')
 
         # ----- Events -----
+        self.input_state = InputState()                             # Polls the inputs once per frame
+        self.inputs = self.input_state.snapshot                     # InputSnapshot for the current frame
         self.events = []                                            # List of Pygame events
-        pygame.event.set_allowed([QUIT, KEYDOWN, MOUSEBUTTONDOWN])  # Restrict the allowed events to boost FPS
-
-        # ----- Preloaded Fonts -----
-        self.hud_font = load_font(DIGITAL, 40)              # Font for sidebar
-        self.reg_font = load_font('GeosansLight.ttf', 28)   # General font object
+        pygame.event.set_blocked(None)                              # Restrict the allowed events to boost FPS
+        pygame.event.set_allowed([QUIT, KEYDOWN, KEYUP, MOUSEBUTTONDOWN])
 
         # ----- Other -----
         self.level = None           # Level object that keeps track of game state
+        self.pause_menu = None      # Menu shown while the game is paused, created when first needed
+        self.pause_buttons = {}
+        self.transition = Transition()  # Fade that hides the generation of the next level
+        self.exit_reached = False   # Whether the player reached the exit of the level this frame
+        self.music_task = None      # BackgroundTask that loads and starts the music
+        self.recorder = None        # FrameRecorder while the frames are being recorded
+        self.raw_capture = raw_capture
+        self.telemetry = Telemetry(telemetry_path) if telemetry_path else NO_TELEMETRY
+        self.scheduler = FrameScheduler(1000.0 / fps)   # Runs low-priority level work in the time left in each frame
+        self.frame_start = time.time()  # Time when the current frame started
+
+    @property
+    def hud_font(self):
+        """ Font for sidebar, loaded on first use. """
+        return load_font(DIGITAL, 40)
+
+    @property
+    def reg_font(self):
+        """ General font object, loaded on first use. """
+        return load_font('GeosansLight.ttf', 28)
 
     def terminate(self):
         """ (None) -> None
         End the game as soon as possible.
         """
         print('Closing game...')
+        if self.recorder is not None:
+            self.recorder.stop()
+        self.telemetry.close()
+        self.report_deferred_jobs()
         pygame.quit()
         sys.exit()
 
@@ -60,6 +104,14 @@ class Game(object):
         """
         self.display_surf.fill(BLACK)
 
+    def poll_inputs(self):
+        """ (None) -> InputSnapshot
+        Take the snapshot of the inputs for this frame and return it.
+        """
+        self.inputs = self.input_state.poll()
+        self.events = self.inputs.events
+        return self.inputs
+
     def check_for_quits(self):
         """ (None) -> None
         Check for and respond to QUIT events and the ESCAPE key press.
@@ -73,16 +125,21 @@ class Game(object):
         Update the game state.
         """
         self.clear_screen()
-        self.events = pygame.event.get()
+        self.poll_inputs()
         self.check_for_quits()
+        if CAPTURE_KEY in self.inputs.keys_pressed:
+            self.toggle_capture()
+        if self.transition.is_active():
+            self.update_transition()
+            return
 
         # Draw the Pause Menu if necessary
-        for event in self.events:
-            if event.type == KEYDOWN and event.key == K_ESCAPE:
-                self.draw_pause_menu()
+        if K_ESCAPE in self.inputs.keys_pressed:
+            self.draw_pause_menu()
 
-        self.level.update()
+        self.level.update(self.inputs)
         self.level.draw(self.display_surf)
+        self.level.draw_minimap(self.display_surf, (10, 10))
 
         # Draw sidebar text, coloured red if the property is low
         self.draw_hud_text(0, 'Level ' + str(self.level.level_num))
@@ -99,7 +156,50 @@ class Game(object):
         else:
             self.draw_hud_text(150, 'Ammo: ' + str(self.level.ammo), RED)
 
+        # Generate the next level in the background once this frame is on the screen. After the
+        # last level there is nothing to generate, and run() goes on to the win screen.
+        if self.exit_reached:
+            self.exit_reached = False
+            if self.level.level_num >= LAST_LEVEL:
+                self.level.level_num += 1
+            else:
+                self.scheduler.clear()
+                self.transition.start(self.display_surf, BackgroundTask(self.level.increment))
+
         self.redraw_and_proceed_tick()
+        # Resizing shifts the level, so it must wait until the next level has finished loading
+        if self.resolution is not None and not self.transition.is_loading() and \
+                self.resolution.update(self.fps_clock.get_rawtime()):
+            scale = self.resolution.get_scale()
+            self.set_render_size((int(self.render_size[0] * scale), int(self.render_size[1] * scale)))
+
+    def update_transition(self):
+        """ (None) -> None
+        Draw the next frame of the transition between levels. The level is neither updated nor
+        drawn until the next level is ready, and is then drawn still while it fades in.
+        """
+        self.transition.update()
+        if not self.transition.is_loading():
+            self.level.draw(self.display_surf)
+        self.transition.draw(self.display_surf, self.reg_font)
+        self.redraw_and_proceed_tick()
+
+    def finish_level(self):
+        """ (None) -> None
+        Start the transition to the next level at the end of this frame.
+        Called by the level when the player reaches the exit.
+        """
+        self.exit_reached = True
+
+    def set_render_size(self, size):
+        """ (tuple) -> None
+        Draw the game at the given (width, height) from now on, keeping the player at the center.
+        """
+        self.display.set_render_size(size)
+        self.display_surf = self.display.surface
+        self.screen_w, self.screen_h = self.display.get_render_size()
+        if self.level is not None:
+            self.level.resize(self.screen_w, self.screen_h)
 
     def draw_text(self, font, text='', x=0, y=0, center=False, colour=WHITE, surface=None):
         """ (Font, [str], [int], [int], [tuple], [Surface]) -> None
@@ -123,148 +223,241 @@ class Game(object):
         x = self.screen_w - self.hud_font.size(text)[0]
         self.draw_text(self.hud_font, text, x, y, colour=colour)
 
+    def draw_menu(self, menu):
+        """ (Menu) -> None
+        Draw the given menu and show it, if anything on it changed since it was last shown.
+        """
+        if menu.draw(self.display_surf):
+            self.display.present()
+
+    def wait_for_menu_inputs(self, menu, timeout=MENU_WAKE_TIME):
+        """ (Menu, [int]) -> InputSnapshot
+        Wait for the inputs of the next frame of the given menu and update the menu with them.
+        Animated menus run at the desired FPS, and still menus sleep until there is input or
+        the given number of milliseconds pass.
+        """
+        if menu.is_animating():
+            self.fps_clock.tick(self.desired_fps)
+            self.poll_inputs()
+        else:
+            self.inputs = self.input_state.wait(timeout)
+            self.events = self.inputs.events
+        menu.update(self.inputs)
+        return self.inputs
+
     def draw_pause_menu(self):
         """ (None) -> None
         Draw a pause menu and loop until the player presses ESCAPE.
         """
-        buttons = {'play': Button('Return to Game', self.screen_w // 2, self.screen_h // 2 - 50),
-                   'quit': Button('Quit', self.screen_w // 2, self.screen_h // 2 + 50)}
+        if self.pause_menu is None or self.pause_menu.size != (self.screen_w, self.screen_h):
+            self.pause_menu = Menu((self.screen_w, self.screen_h))
+            self.pause_menu.add(Label(self.hud_font, 'PAUSED...', self.screen_w, 0, anchor='topright'))
+            self.pause_buttons = {'play': Button('Return to Game', self.screen_w // 2, self.screen_h // 2 - 50),
+                                  'quit': Button('Quit', self.screen_w // 2, self.screen_h // 2 + 50)}
+            for button in self.pause_buttons.values():
+                self.pause_menu.add(button)
+        self.pause_menu.invalidate()
         pausing = True
         while pausing:
-            self.clear_screen()
-            for event in pygame.event.get():
-                if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                    pausing = False
-            self.draw_hud_text(0, 'PAUSED...')
-            for button_type in buttons:
-                buttons[button_type].update()
-                buttons[button_type].draw(self.display_surf)
-            if buttons['play'].pressed(): pausing = False
-            if buttons['quit'].pressed(): self.terminate()
-            self.redraw_and_proceed_tick()
+            self.draw_menu(self.pause_menu)
+            inputs = self.wait_for_menu_inputs(self.pause_menu)
+            if K_ESCAPE in inputs.keys_pressed or any(event.type == QUIT for event in inputs.events):
+                pausing = False
+            if self.pause_buttons['play'].pressed(): pausing = False
+            if self.pause_buttons['quit'].pressed(): self.terminate()
 
     def update_title_buttons(self, **buttons):
-        """ (None) -> bool
-        Update, draw, and respond to the buttons on the title screen.
-        Return True if the game should begin, False otherwise.
+        """ (None) -> str
+        Respond to the buttons on the title screen.
+        Return 'play' or 'endless' if that kind of game should begin, None otherwise.
         """
-        for button_label in buttons:
-            buttons[button_label].update()
-            buttons[button_label].draw(self.display_surf)
         if buttons['quit'].pressed():
             self.terminate()
-        if buttons['play'].pressed():
-            return True
-        return False
+        for mode in 'play', 'endless':
+            if buttons[mode].pressed():
+                return mode
+        return None
 
     def draw_title_screen(self):
-        """ (None) -> None
+        """ (None) -> str
         Draw a title screen and loop around to poll user actions on the menu.
+        Return 'play' or 'endless' depending on which kind of game the player chose.
         """
-        buttons = {'play': Button('New Game', self.screen_w // 2, self.screen_h // 2 + 80),
-                   'quit': Button('Quit', self.screen_w // 2, self.screen_h // 2 + 150)}
-        stripes = [Stripe(100, 0), Stripe(self.screen_w - 100, 0)]
+        menu = Menu((self.screen_w, self.screen_h))
+        menu.add(Label(load_font(SLEEK, 72), TITLE, self.screen_w // 2, self.screen_h // 2 - 60))
+        menu.add(Label(load_font(SLEEK, 28), SHORT_DESCR, self.screen_w // 2, self.screen_h // 2))
+        buttons = {'play': menu.add(Button('New Game', self.screen_w // 2, self.screen_h // 2 + 80)),
+                   'endless': menu.add(Button('Endless', self.screen_w // 2, self.screen_h // 2 + 150)),
+                   'quit': menu.add(Button('Quit', self.screen_w // 2, self.screen_h // 2 + 220))}
+        menu.add(Stripe(100, 0, max_length=self.screen_h))
+        menu.add(Stripe(self.screen_w - 100, 0, max_length=self.screen_h))
         while True:
-            # Clear screen and check for events.
-            self.clear_screen()
-            self.events = pygame.event.get()
+            # Show the menu, then wait for events.
+            self.draw_menu(menu)
+            if self.startup.get_phase('title') is None:
+                self.startup.mark('title')
+            self.wait_for_menu_inputs(menu)
             self.check_for_quits()
 
-            # Draw the game title and description.
-            x, y = self.screen_w // 2, self.screen_h // 2 - 60
-            self.draw_text(load_font(SLEEK, 72), TITLE, x, y, 1)
-            x, y = self.screen_w // 2, self.screen_h // 2
-            self.draw_text(load_font(SLEEK, 28), SHORT_DESCR, x, y, 1)
-
-            # Update all of the title buttons and check for game start.
-            if self.update_title_buttons(**buttons): break
-
-            # Update all of the stripes.
-            for stripe in stripes:
-                stripe.update()
-                stripe.draw(self.display_surf)
-
-            # Update the game window and delay to enforce FPS.
-            self.redraw_and_proceed_tick()
+            # Check the title buttons for game start.
+            mode = self.update_title_buttons(**buttons)
+            if mode: return mode
 
     def draw_game_over_screen(self, time=5):
         """ ([int]) -> None
-        Draw a game over screen for the given number of seconds.
+        Draw a game over screen for the given number of seconds, responding to events meanwhile.
         """
-        self.clear_screen()
-        self.draw_hud_text(50, 'Game Over! Returning to main menu...')
-        self.redraw_and_proceed_tick()
-        pygame.time.delay(1000 * time)
+        text = 'Game Over! Returning to main menu...'
+        menu = Menu((self.screen_w, self.screen_h))
+        menu.add(Label(self.hud_font, text, self.screen_w, 50, anchor='topright'))
+        end = pygame.time.get_ticks() + 1000 * time
+        while pygame.time.get_ticks() < end:
+            self.draw_menu(menu)
+            self.wait_for_menu_inputs(menu, max(1, end - pygame.time.get_ticks()))
+            self.check_for_quits()
 
     def display_story(self):
         """ (None) -> None
         Show the game's backstory.
         """
+        menu = Menu((self.screen_w, self.screen_h))
+        menu.add(Picture(self.level.wall_image, 0, 0))
+        menu.add(Picture(self.level.player.current_images[0], 85, 85))
+        menu.add(Label(self.reg_font, 'Howard Hulk woke up in a large, strange room in a cave.', 280, 150,
+                       anchor='topleft'))
+        menu.add(Label(self.reg_font, 'The cave is filled with deadly but seemingly unintelligent zombies.',
+                       280, 250, anchor='topleft'))
+        menu.add(Label(self.reg_font, 'He has no choice but to keep running and search for an exit.',
+                       280, 350, anchor='topleft'))
+        menu.add(Label(self.reg_font, 'Help him begin his exit dash. Press SPACE to start.', 280, 450,
+                       anchor='topleft'))
         done = False
         while not done:
-            self.clear_screen()
-            for event in pygame.event.get():
-                if event.type == QUIT or (event.type == KEYDOWN and event.key == K_SPACE):
-                    done = True
-
-            self.display_surf.blit(self.level.wall_image, (0, 0))
-            self.display_surf.blit(self.level.player.current_images[0], (85, 85))
-            self.draw_text(self.reg_font, 'Howard Hulk woke up in a large, strange room in a cave.', 280, 150)
-            self.draw_text(self.reg_font, 'The cave is filled with deadly but seemingly unintelligent zombies.',
-                           280, 250)
-            self.draw_text(self.reg_font, 'He has no choice but to keep running and search for an exit.',
-                           280, 350)
-            self.draw_text(self.reg_font, 'Help him begin his exit dash. Press SPACE to start.', 280, 450)
-
-            self.redraw_and_proceed_tick()
+            self.draw_menu(menu)
+            inputs = self.wait_for_menu_inputs(menu)
+            if K_SPACE in inputs.keys_pressed or any(event.type == QUIT for event in inputs.events):
+                done = True
 
     def display_win_screen(self):
         """ (None) -> None
         Display a screen to show the player that they beat the game.
         """
-        image = pygame.transform.scale(load_image('hyperion.png'), [1920, 1080])
+        menu = Menu((self.screen_w, self.screen_h))
+        menu.add(Picture(pygame.transform.scale(load_image('hyperion.png'), (self.screen_w, self.screen_h)), 0, 0))
+        menu.add(Label(self.reg_font, 'Howard fell through what he thought was just another hatch.', 10, 50,
+                       anchor='topleft'))
+        menu.add(Label(self.reg_font, 'It led to a vast, open, free world. Something that Howard calls home.',
+                       10, 150, anchor='topleft'))
+        menu.add(Label(self.reg_font, 'He found the exit. You win.', 10, 250, anchor='topleft'))
+        menu.add(Label(self.reg_font, 'Programming by ' + PROGRAMMER + ' Press ESCAPE to exit.', 10, 350,
+                       anchor='topleft'))
         done = False
         while not done:
-            self.clear_screen()
-            for event in pygame.event.get():
-                if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                    done = True
-
-            self.display_surf.blit(image, (0, 0))
-            self.draw_text(self.reg_font, 'Howard fell through what he thought was just another hatch.', 10, 50)
-            self.draw_text(self.reg_font, 'It led to a vast, open, free world. Something that Howard calls home.',
-                           10, 150)
-            self.draw_text(self.reg_font, 'He found the exit. You win.',
-                           10, 250)
-            self.draw_text(self.reg_font, 'Programming by ' + PROGRAMMER + ' Press ESCAPE to exit.', 10, 350)
+            self.draw_menu(menu)
+            inputs = self.wait_for_menu_inputs(menu)
+            if K_ESCAPE in inputs.keys_pressed or any(event.type == QUIT for event in inputs.events):
+                done = True
 
-            self.redraw_and_proceed_tick()
+    def toggle_capture(self):
+        """ (None) -> None
+        Start recording the frames into a new directory, or stop recording.
+        """
+        if self.recorder is None:
+            directory = os.path.join(CAPTURE_DIR, time.strftime('%Y%m%d-%H%M%S'))
+            self.recorder = FrameRecorder(directory, self.display_surf.get_size(), self.raw_capture)
+        else:
+            self.recorder.stop()
+            self.recorder = None
 
     def redraw_and_proceed_tick(self):
         """ (None) -> None
-        Update the screen and enforce the desired FPS.
+        Update the screen, record it if recording, run low-priority level work in the time left
+        in the frame, and enforce the desired FPS.
         """
-        pygame.display.flip()
+        if self.recorder is not None:
+            self.recorder.capture(self.display_surf)
+        self.display.present()
+        if not self.transition.is_active():    # The level must not be touched while the next one loads
+            self.scheduler.run(self.frame_start)
         self.fps_clock.tick_busy_loop(self.desired_fps)
+        self.frame_start = time.time()
         self.measured_fps = self.fps_clock.get_fps()
+        self.telemetry.next_frame(self.fps_clock.get_time(), self.level.level_num)
+
+    def report_deferred_jobs(self):
+        """ (None) -> None
+        Print how long the low-priority jobs waited and ran for.
+        """
+        for name, stats in sorted(self.scheduler.get_stats().items()):
+            print('Deferred job %s: %d runs, %.2f ms mean and %.2f ms max latency, %.3f ms mean time' %
+                  (name, stats['runs'], stats['mean_latency'], stats['max_latency'], stats['mean_time']))
+
+    def start_music(self, filename):
+        """ (str) -> None
+        Start looping the music with the given filename on a background thread, after any music
+        that is still loading.
+        """
+        self.music_task = BackgroundTask(self.play_music, filename, self.music_task)
 
     @staticmethod
-    def start_music(filename):
-        pygame.mixer.music.load(get_music_path(filename))
-        pygame.mixer.music.play(-1)
+    def play_music(filename, previous=None):
+        """ (str, [BackgroundTask]) -> None
+        Wait for the given music-loading task, then loop the music with the given filename,
+        initializing the mixer the first time. Slow, so it runs on a background thread.
+        """
+        if previous is not None:
+            previous.result()
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.music.load(get_music_path(filename))
+            pygame.mixer.music.play(-1)
+        except pygame.error as error:
+            print('WARNING: Could not play music ' + filename + ': ' + str(error))
+
+    def create_level(self, level_class=Level, previous=None):
+        """ ([type], [BackgroundTask]) -> Level
+        Wait for the given level-creating task, then instantiate and generate a level of the given
+        class. Safe to call on a background thread, since levels are never generated at once.
+        """
+        if previous is not None:
+            previous.result()
+        level = level_class('concrete.png', 'rockwall.png')
+        level.on_exit = self.finish_level
+        level.telemetry = self.telemetry
+        level.scheduler = self.scheduler
+        level.generate(self)
+        if self.startup.get_phase('level') is None:
+            self.startup.mark('level')
+        return level
+
+    def wait_for_level(self, task):
+        """ (BackgroundTask) -> Level
+        Show a loading message until the given level-creating task finishes, and return the level.
+        """
+        menu = Menu((self.screen_w, self.screen_h))
+        menu.add(Label(self.reg_font, 'Loading...', self.screen_w // 2, self.screen_h // 2))
+        while not task.done():
+            self.draw_menu(menu)
+            self.wait_for_menu_inputs(menu, 50)
+            self.check_for_quits()
+        return task.result()
 
     def run(self):
         """ (None) -> None
         Execute Rogueline.
         """
         while True:
-            # Instantiate and prepare level
-            self.level = Level('concrete.png', 'rockwall.png')
-            self.level.generate(self)
+            # Generate the level in the background while the title screen is up
+            loading = BackgroundTask(self.create_level, Level)
 
             # Play title music and show title screen
             self.start_music('music2.mp3')
-            self.draw_title_screen()
+            if self.draw_title_screen() == 'endless':
+                # Generated after the regular level, since levels share the sprite caches
+                loading = BackgroundTask(self.create_level, EndlessLevel, loading)
+            self.level = self.wait_for_level(loading)
+            self.scheduler.clear()      # Jobs left over from the last game belong to its level
 
             # Show game backstory
             self.display_story()
@@ -273,10 +466,13 @@ class Game(object):
             self.start_music('music1.mp3')
             while True:
                 self.update()
+                if not self.startup.reported:
+                    self.startup.mark('first frame')
+                    self.startup.report()
                 if self.level.player.health <= 0:
                     self.draw_game_over_screen()
                     break
-                elif self.level.level_num > LAST_LEVEL:
+                elif self.level.is_complete():
                     break
 
             if self.level.player.health > 0:
@@ -0,0 +1,108 @@
+#####################################
+# Filename: geometry.py
+# Description: Decomposes the rooms and hallways of a level into disjoint floor
+#               and wall rectangles
+#####################################
+
+from constants import *
+
+
+def merge(intervals):
+    """ (list) -> list
+    Return the union of the given (start, end) intervals as a sorted list of disjoint intervals.
+    """
+    result = []
+    for low, high in sorted(intervals):
+        if result and low <= result[-1][1]:
+            if high > result[-1][1]:
+                result[-1] = result[-1][0], high
+        else:
+            result.append((low, high))
+    return result
+
+
+def subtract(intervals, holes):
+    """ (list, list) -> list
+    Return the parts of the given sorted, disjoint intervals that are outside of the given
+    sorted, disjoint holes.
+    """
+    result = []
+    for low, high in intervals:
+        for hole_low, hole_high in holes:
+            if hole_high <= low or hole_low >= high:
+                continue
+            if hole_low > low:
+                result.append((low, hole_low))
+            low = max(low, hole_high)
+            if low >= high:
+                break
+        if low < high:
+            result.append((low, high))
+    return result
+
+
+def decompose(include, exclude=()):
+    """ (list, [list]) -> list
+    Return a list of disjoint Rects that exactly cover the area inside the include Rects and
+    outside the exclude Rects.
+    """
+    xs = set()
+    for rect in include:
+        xs.update((rect.left, rect.right))
+    for rect in exclude:
+        xs.update((rect.left, rect.right))
+    if not xs:
+        return []
+    xs = sorted(xs)
+
+    # Sweep across the vertical slabs between consecutive x co-ordinates. Wherever the covered
+    # interval of a slab continues the same interval of the slab to its left, widen that Rect.
+    result = []
+    columns = {}        # Rects that reach the current slab, keyed by their (top, bottom)
+    for left, right in zip(xs, xs[1:]):
+        covered = merge([(rect.top, rect.bottom) for rect in include if rect.left <= left and rect.right >= right])
+        holes = merge([(rect.top, rect.bottom) for rect in exclude if rect.left <= left and rect.right >= right])
+        new_columns = {}
+        for interval in subtract(covered, holes):
+            rect = columns.get(interval)
+            if rect is not None:
+                rect.width += right - left
+            else:
+                rect = pygame.Rect(left, interval[0], right - left, interval[1] - interval[0])
+                result.append(rect)
+            new_columns[interval] = rect
+        columns = new_columns
+    return result
+
+
+class LevelGeometry(object):
+    """ The floor of a level and the wall border around it as disjoint Rects, so that every
+    pixel of the level is covered exactly once. """
+
+    def __init__(self, rects, wall_width, bounds=None):
+        """ (list, int, [Rect]) -> LevelGeometry
+        Decompose the union of the given room and hallway Rects, and the border of the given
+        width around it. With bounds, only the part inside the bounds Rect is decomposed.
+        """
+        borders = [rect.inflate(2 * wall_width, 2 * wall_width) for rect in rects]
+        if bounds is not None:
+            rects = [rect.clip(bounds) for rect in rects if rect.colliderect(bounds)]
+            borders = [rect.clip(bounds) for rect in borders if rect.colliderect(bounds)]
+        self.floors = decompose(rects)
+        self.walls = decompose(borders, rects)
+
+    def extend(self, geometry):
+        """ (LevelGeometry) -> None
+        Add the Rects of the given geometry, which must not overlap the Rects of this geometry.
+        """
+        self.floors.extend(geometry.floors)
+        self.walls.extend(geometry.walls)
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Shift every Rect by the given increments.
+        """
+        for rect in self.floors:
+            rect.move_ip(dx, dy)
+        for rect in self.walls:
+            rect.move_ip(dx, dy)
@@ -0,0 +1,137 @@
+#####################################
+# Filename: grid.py
+# Description: Uniform grid laid over the rooms and paths of a level
+#####################################
+
+from bisect import bisect_left
+
+
+class LevelGrid(object):
+    """ Uniform grid of square cells covering the rooms and paths of a level. """
+
+    def __init__(self, rects, cell_size, bounds=None, grids=()):
+        """ (list, int, [Rect], [list]) -> LevelGrid
+        Instantiate a grid over the given list of room and path Rects. A cell is
+        walkable if it lies completely inside the area covered by the Rects. The grid covers
+        the given bounds, whose width and height must be multiples of the cell size, or else
+        the area of the Rects. The walkable cells of the given grids, whose cells must line up
+        with the cells of this grid, are copied into it too.
+        """
+        if bounds is None:
+            bounds = rects[0].unionall(rects[1:])
+            bounds.size = (bounds.width // cell_size + 1) * cell_size, (bounds.height // cell_size + 1) * cell_size
+        self.cell_size = cell_size
+        self.origin_x = bounds.left         # On-screen co-ordinates of the top-left cell
+        self.origin_y = bounds.top
+        self.cols = bounds.width // cell_size
+        self.rows = bounds.height // cell_size
+        self.walkable = [False] * (self.cols * self.rows)
+
+        # Sample three points across each cell along both axes, mark the samples that fall
+        # inside any Rect, and consider a cell walkable when all nine of its samples are covered.
+        # This accepts cells that straddle the seam between two touching Rects.
+        offsets = 1, cell_size // 2, cell_size - 2
+        xs = [self.origin_x + col * cell_size + offset for col in range(self.cols) for offset in offsets]
+        ys = [self.origin_y + row * cell_size + offset for row in range(self.rows) for offset in offsets]
+        covered = [bytearray(len(xs)) for y in ys]
+        for rect in rects:
+            left, right = bisect_left(xs, rect.left), bisect_left(xs, rect.right)
+            for i in range(bisect_left(ys, rect.top), bisect_left(ys, rect.bottom)):
+                covered[i][left:right] = b'\x01' * (right - left)
+        full = b'\x01' * 3
+        cells = []
+        for rect in rects:
+            first_col = (rect.left - self.origin_x) // cell_size
+            last_col = (rect.right - 1 - self.origin_x) // cell_size
+            first_row = (rect.top - self.origin_y) // cell_size
+            last_row = (rect.bottom - 1 - self.origin_y) // cell_size
+            for row in range(first_row, last_row + 1):
+                top, middle, bottom = covered[3 * row:3 * row + 3]
+                for col in range(first_col, last_col + 1):
+                    index = row * self.cols + col
+                    start, end = 3 * col, 3 * col + 3
+                    if not self.walkable[index] and top[start:end] == full and \
+                            middle[start:end] == full and bottom[start:end] == full:
+                        self.walkable[index] = True
+                        cells.append(index)
+        for grid in grids:
+            cells.extend(self.paste(grid))
+        self.cells = cells          # Indices of the walkable cells
+
+        # Pre-compute the walkable 4-neighbourhood of every walkable cell, in the same order as
+        # get_adjacent() (inlined, since this runs every time that an endless level changes).
+        walkable, cols, count = self.walkable, self.cols, len(self.walkable)
+        self.neighbours = neighbours = [()] * count
+        for index in cells:
+            col = index % cols
+            neighbours[index] = tuple([i for i in (index + 1 if col < cols - 1 else -1, index - cols,
+                                                   index - 1 if col else -1, index + cols)
+                                       if 0 <= i < count and walkable[i]])
+
+    def __len__(self):
+        return len(self.walkable)
+
+    def paste(self, grid):
+        """ (LevelGrid) -> list
+        Copy the cells of the given grid, whose cells line up with the cells of this grid and lie
+        inside of it, into this grid, and return the indices of its walkable cells in this grid.
+        """
+        first = (grid.origin_y - self.origin_y) // self.cell_size * self.cols + \
+            (grid.origin_x - self.origin_x) // self.cell_size
+        for row in range(grid.rows):
+            start = first + row * self.cols
+            self.walkable[start:start + grid.cols] = grid.walkable[row * grid.cols:(row + 1) * grid.cols]
+        stride = self.cols - grid.cols
+        return [first + cell + cell // grid.cols * stride for cell in grid.cells]
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Move the grid along with the rest of the level.
+        """
+        self.origin_x += dx
+        self.origin_y += dy
+
+    def get_adjacent(self, index):
+        """ (int) -> list
+        Return the indices of the cells directly right, above, left of and below the given cell.
+        """
+        col, row = index % self.cols, index // self.cols
+        result = []
+        if col < self.cols - 1: result.append(index + 1)
+        if row > 0: result.append(index - self.cols)
+        if col > 0: result.append(index - 1)
+        if row < self.rows - 1: result.append(index + self.cols)
+        return result
+
+    def get_cell(self, x, y):
+        """ (int, int) -> int
+        Return the index of the cell containing the given on-screen point, or -1 if the
+        point is outside of the grid.
+        """
+        col = int(x - self.origin_x) // self.cell_size
+        row = int(y - self.origin_y) // self.cell_size
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return -1
+
+    def locate(self, x, y):
+        """ (int, int) -> int
+        Return the index of the walkable cell containing the given on-screen point. Points that
+        sit in a partial cell against a wall resolve to an adjacent walkable cell. Return -1 if
+        no walkable cell is close enough.
+        """
+        index = self.get_cell(x, y)
+        if index < 0 or self.walkable[index]:
+            return index
+        for i in self.get_adjacent(index):
+            if self.walkable[i]:
+                return i
+        return -1
+
+    def get_center(self, index):
+        """ (int) -> tuple
+        Return the on-screen co-ordinates of the center of the given cell as a 2-tuple.
+        """
+        half = self.cell_size // 2
+        return (self.origin_x + (index % self.cols) * self.cell_size + half,
+                self.origin_y + (index // self.cols) * self.cell_size + half)
@@ -10,11 +10,104 @@ from constants import *
 from random import randint
 
 
+class Menu(object):
+    """ Screen of retained widgets that is only redrawn when one of the widgets changes. """
+
+    def __init__(self, size, background=BLACK):
+        """ (tuple, [tuple]) -> Menu
+        Instantiate an empty menu for a screen of the given size with the given background colour.
+        """
+        self.size = size
+        self.background = background
+        self.widgets = []
+        self.dirty = True       # Whether the whole menu has to be redrawn
+
+    def add(self, widget):
+        """ (object) -> object
+        Add the given widget on top of the other widgets and return it.
+        """
+        self.widgets.append(widget)
+        self.dirty = True
+        return widget
+
+    def invalidate(self):
+        """ (None) -> None
+        Make the menu redraw itself the next time that it is drawn, such as after another screen was shown.
+        """
+        self.dirty = True
+
+    def is_animating(self):
+        """ (None) -> bool
+        Return True if any widget changes on its own from frame to frame, False otherwise.
+        """
+        return any(widget.animating for widget in self.widgets)
+
+    def update(self, inputs):
+        """ (InputSnapshot) -> None
+        Update every widget with the given inputs.
+        """
+        for widget in self.widgets:
+            widget.update(inputs)
+
+    def draw(self, surface):
+        """ (Surface) -> bool
+        Redraw the menu onto the given Surface if anything changed since it was last drawn.
+        Return True if the menu was redrawn, False otherwise.
+        """
+        if not self.dirty and not any(widget.dirty for widget in self.widgets):
+            return False
+        surface.fill(self.background)
+        for widget in self.widgets:
+            widget.draw(surface)
+            widget.dirty = False
+        self.dirty = False
+        return True
+
+
+class Label(object):
+    """ Static text that is only rendered once. """
+
+    animating = False
+
+    def __init__(self, font, text, x, y, colour=WHITE, anchor='center'):
+        """ (Font, str, int, int, [tuple], [str]) -> Label
+        Instantiate a Label with the given font, text and colour. The given co-ordinates are the
+        point of the text's bounding box named by the anchor, such as 'center' or 'topleft'.
+        """
+        self.surface = font.render(str(text), 1, colour)
+        self.rect = self.surface.get_rect()
+        setattr(self.rect, anchor, (x, y))
+        self.dirty = True
+
+    def update(self, inputs):
+        pass
+
+    def draw(self, surface):
+        """ (Surface) -> None
+        Draw the Label onto the given Surface object.
+        """
+        surface.blit(self.surface, self.rect)
+
+
+class Picture(Label):
+    """ Static image. """
+
+    def __init__(self, image, x, y, anchor='topleft'):
+        """ (Surface, int, int, [str]) -> Picture
+        Instantiate a Picture of the given image with its anchor point at the given co-ordinates.
+        """
+        self.surface = image
+        self.rect = self.surface.get_rect()
+        setattr(self.rect, anchor, (x, y))
+        self.dirty = True
+
+
 class Button(object):
     """ Sleek, Pygame-based button control. """
 
     on_colour = YELLOW
     off_colour = WHITE
+    animating = False
 
     def __init__(self, text='', x=0, y=0, size=48):
         """ ([str], [int], [int], [int], [tuple]) -> Button
@@ -32,18 +125,23 @@ class Button(object):
         self.text_rect = self.text_surface_on.get_rect()
         self.text_rect.center = x, y
         self.hovering = False
+        self.clicked = False
+        self.dirty = True
 
     def pressed(self):
         """ (None) -> bool
-        Return True if the mouse clicked the button, False otherwise. """
-        return pygame.mouse.get_pressed()[0] and self.hovering
+        Return True if the mouse clicked the button during the last update, False otherwise. """
+        return self.clicked
 
-    def update(self):
-        """ (None) -> None
-        Update the state of the Button. Call on every iteration of the game loop.
+    def update(self, inputs):
+        """ (InputSnapshot) -> None
+        Update the state of the Button with the given inputs. Call on every iteration of the game loop.
         """
         if self.x > 2000 or self.y > 2000: return
-        self.hovering = self.text_rect.collidepoint(pygame.mouse.get_pos())
+        hovering = self.text_rect.collidepoint(inputs.mouse_pos)
+        self.dirty = self.dirty or hovering != self.hovering
+        self.hovering = hovering
+        self.clicked = self.hovering and bool(inputs.mouse_buttons[0])
 
     def draw(self, surface):
         """ (Surface) -> None
@@ -58,9 +156,10 @@ class Button(object):
 class Stripe(object):
     """ Vertical or horizontal stripe. """
 
-    def __init__(self, x, y, thickness=50, vertical=True):
-        """ (int, int, [int], [bool]) -> Stripe
-        Instantiate a Stripe object with the given co-ordinates and thickness.
+    def __init__(self, x, y, thickness=50, vertical=True, max_length=None):
+        """ (int, int, [int], [bool], [int]) -> Stripe
+        Instantiate a Stripe object with the given co-ordinates and thickness that grows
+        up to the given length (without limit by default).
         """
         # ----- parameter-based properties -----
         self.x = x
@@ -71,13 +170,21 @@ class Stripe(object):
         # ----- get random colour and length -----
         self.colour = [randint(70, 255), randint(70, 255), randint(70, 255)]
         self.length = randint(50, 100)
+        self.max_length = max_length
+        self.dirty = True
 
-    def update(self):
-        """ (None) -> None
+    @property
+    def animating(self):
+        """ Whether the Stripe is still growing. """
+        return self.x < 2000 and self.y < 2000 and (self.max_length is None or self.length < self.max_length)
+
+    def update(self, inputs=None):
+        """ ([InputSnapshot]) -> None
         Lengthen the Stripe as necessary to provide a growing effect. Call on every game update.
         """
-        if self.x < 2000 and self.y < 2000:
+        if self.animating:
             self.length += 2
+            self.dirty = True
 
     def draw(self, surface):
         """ (None) -> None
@@ -18,7 +18,7 @@ class Item(ShiftableObject):
         """
         ShiftableObject.__init__(self, x, y)
         self.type = str(itemtype)
-        self.image = load_image(image)
+        self.image = get_image(image)     # Shared with the other items that use the same image
         self.width = self.image.get_width()
         self.height = self.image.get_height()
         self.visible = True
@@ -40,7 +40,7 @@ class Item(ShiftableObject):
         """ (None) -> None
         Update the state of the Item.
         """
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.topleft = self.x, self.y
 
     def draw(self, surface):
         """ (Surface) -> None
@@ -10,9 +10,26 @@ from constants import *
 from data_loader import *
 from bullet import Bullet
 from character import Player, Enemy, Splatter
+from collision import CollisionResolver
+from crowd import CrowdSteering
+from controls import NO_INPUT
 from ending import Lock, Key
+from entities import *
+from geometry import LevelGeometry
+from grid import LevelGrid
 from item import Item
+from lod import LODScheduler
+from minimap import Minimap
+from navigation import FlowField
+from pool import Pool
+from regions import RegionIndex
+from scheduler import FrameScheduler
+from raycast import get_exit_fraction, get_first_hit
+from render import *
+from spatial import SpatialHash
 from spritesheet import Spritesheet
+from telemetry import *
+from visibility import FieldOfView, Fog
 
 
 class Level(object):
@@ -33,29 +50,69 @@ class Level(object):
         self.rooms = []             # List of room Rect objects
         self.path_width = 260       # Width of each path
         self.wall_width = 35        # Thickness of each wall
-        self.wall_surfaces = []     # List of wall (outer) Surfaces for rooms and paths
-        self.floor_surfaces = []    # List of floor (inner) Surfaces
+        self.geometry = None        # LevelGeometry with the disjoint floor and wall Rects
+        self.wall_surfaces = []     # List of wall Surfaces, in the same order as geometry.walls
+        self.floor_surfaces = []    # List of floor Surfaces, in the same order as geometry.floors
+        self.grid = None            # LevelGrid laid over the rooms and paths
+        self.flow_field = None      # FlowField that leads enemies toward the player
+        self.region_index = None    # RegionIndex that finds the room or path containing a point
+        self.collision_resolver = None  # CollisionResolver that keeps characters off the walls
+        self.field_of_view = None   # FieldOfView of the player over the grid
+        self.fog = None             # Fog that darkens the cells outside of the field of view
+        self.minimap = None         # Minimap of the rooms and paths
 
         # ----- Level objects -----
-        self.items = []
+        self.entities = Registry()  # Enemies, items, bullets, blood, lock, key and player
         self.ammo = 15
         self.key = None
-        self.blood = []
+        self.lock = None
 
         # ----- Characters -----
         self.player = None
-        self.enemies = []
+        self.lod = LODScheduler()   # Decides how often far-away enemies are updated
+        self.crowd = CrowdSteering()    # Keeps chasing enemies from stacking on top of each other
+        self.enemy_hash = SpatialHash(self.path_width)  # Finds the enemies near a point
+        self.entities.add_hash(ENEMY, self.enemy_hash)
 
         # ----- I/O -----
-        self.keys = None
-        self.mouse_buttons = [0] * 3
+        self.inputs = NO_INPUT      # InputSnapshot for the current frame
+        self.render_queue = None    # RenderQueue for the Surface that the level was last drawn onto
+        self.controller = None      # Object that supplies inputs instead of the user (see Bot)
+        self.telemetry = NO_TELEMETRY   # Telemetry that gameplay events are recorded into
+        self.scheduler = FrameScheduler()   # Runs low-priority work, in the time left in each frame
+                                            # when the game shares its scheduler (see Game)
+        self.on_exit = None         # Function called instead of increment() when the player reaches
+                                    # the exit (see Game.finish_level)
 
         # ----- Other -----
-        self.bullets = []           # List of active bullets
+        self.bullet_pool = Pool(Bullet)         # Reuses bullets and blood splatter instead of allocating them
+        self.splatter_pool = Pool(Splatter)
         self.endpoint = []          # [x, y] co-ordinates of the end of the level
+        self.aborted = False        # True if the last layout stopped adding paths after a collision
         self.screen_w = None        # Screen width and height
         self.screen_h = None        # This data will be obtained later
         self.level_num = 1          # Current level number
+        self.starving_frames = 0    # Frames spent starving since the last roll for starvation damage
+
+    @property
+    def enemies(self):
+        """ List of the enemies in the level. Belongs to the entity registry. """
+        return self.entities.get(ENEMY)
+
+    @property
+    def items(self):
+        """ List of the items in the level that have not been picked up. Belongs to the entity registry. """
+        return self.entities.get(ITEM)
+
+    @property
+    def bullets(self):
+        """ List of the active bullets. Belongs to the entity registry. """
+        return self.entities.get(BULLET)
+
+    @property
+    def blood(self):
+        """ List of the blood splatter, oldest first. Belongs to the entity registry. """
+        return self.entities.get(BLOOD)
 
     @staticmethod
     def get_opposite_dir(direction):
@@ -66,9 +123,11 @@ class Level(object):
 
     def populate_directions(self, numdirections):
         """ (int) -> None
-        Determine path directions (directions are integers from 0 to 3).
+        Determine path directions (directions are integers from 0 to 3). Sets self.aborted if a
+        collision could not be avoided and fewer directions were determined.
         """
         self.directions = []
+        self.aborted = False
         while len(self.directions) < numdirections:
             try:
                 possible_dirs = []
@@ -88,6 +147,7 @@ class Level(object):
                     collision = self.paths[-1].collidelist(self.rooms) != -1 or \
                         self.paths[-1].collidelist(self.paths[:-1]) != -1
                 if collision:
+                    self.aborted = True
                     return
             except IndexError:
                 self.directions.append(randint(0, 3))
@@ -136,27 +196,22 @@ class Level(object):
 
     def populate_output_surfaces(self):
         """ (None) -> None
-        Caches each level object as a list of Surfaces to accelerate and facilitate blitting.
+        Split the rooms and paths into disjoint floor and wall Rects, and cache a Surface for each
+        of them to accelerate and facilitate blitting. Also draws the minimap.
         """
-        self.wall_surfaces = []
-        self.floor_surfaces = []
-        for rect in self.paths + self.rooms:
-            # Create a blank surface to use for the "floor" of each room and hallway.
-            floor_surface = pygame.Surface(rect.size).convert()
-
-            # Tile the floor tiles all over the newly created Surface, starting from the origin (0, 0).
-            self.tile(self.path_image, floor_surface, pygame.Rect((0, 0), rect.size))
-
-            # Add the floor surface to the internal list of all floor surfaces.
-            self.floor_surfaces.append(floor_surface)
-
-            # Calculate an enlarged Rect to use for the outer wall.
-            wall_rect = rect.inflate(2 * self.wall_width, 2 * self.wall_width)
-
-            # Perform the same steps as above, except for the wall tiles instead of the floor tiles.
-            wall_surface = pygame.Surface(wall_rect.size).convert()
-            self.tile(self.wall_image, wall_surface, pygame.Rect((0, 0), wall_rect.size))
-            self.wall_surfaces.append(wall_surface)
+        self.geometry = LevelGeometry(self.paths + self.rooms, self.wall_width)
+        self.wall_surfaces = [self.create_output_surface(self.wall_image, rect) for rect in self.geometry.walls]
+        self.floor_surfaces = [self.create_output_surface(self.path_image, rect) for rect in self.geometry.floors]
+        self.minimap = Minimap(self.paths + self.rooms)
+
+    def create_output_surface(self, image, rect):
+        """ (Surface, Rect) -> Surface
+        Return a Surface the size of the given Rect that is tiled with the given image. The tiles
+        line up with the tiles of every other Surface of the level.
+        """
+        surface = pygame.Surface(rect.size).convert()
+        self.tile(image, surface, surface.get_rect(), (-rect.left, -rect.top))
+        return surface
 
     def add_pass_through_rooms(self, x=5):
         """ (None, [int]) -> None
@@ -177,29 +232,35 @@ class Level(object):
             except IndexError:
                 print('WARNING: Attempted to add pass-through room to nonexistent path!')
 
-    def add_item(self, image, type='food'):
-        room = choice(self.rooms + self.paths)
+    def add_item(self, image, type='food', rooms=None):
+        """ (Surface, [str], [list]) -> Item
+        Add an item of the given type at a random position inside one of the given
+        rooms or hallways (any room or hallway by default) and return it.
+        """
+        room = choice(rooms or self.rooms + self.paths)
         x = randint(room.left, room.right - image.get_width())
         y = randint(room.top, room.bottom - image.get_height())
-        self.items.append(Item(image, x, y, type))
+        return self.entities.add(Item(image, x, y, type), ITEM)
 
-    def generate(self, game=None):
-        """ (None, Game) -> None
-        Generate a pseudorandom world with the given Game instance.
+    def get_num_directions(self):
+        """ (None) -> int
+        Return the number of path directions that the current level number asks for.
+        """
+        return 2 * self.level_num + 3
+
+    def generate_layout(self):
+        """ (None) -> None
+        Generate the rooms and paths of a pseudorandom world around the center of the screen.
+        Does not create any Surfaces or level objects.
         """
         # Generate the central room.
         self.rooms = []
-        if game is not None:
-            self.screen_w = w = game.screen_w
-            self.screen_h = h = game.screen_h
-        else:
-            w = self.screen_w
-            h = self.screen_h
+        w, h = self.screen_w, self.screen_h
         room_size = 3 * self.path_width // 2
         self.rooms.append(pygame.Rect(w // 2 - room_size, h // 2 - room_size, 2 * room_size, 2 * room_size))
 
         # Determine path directions (Directions are integers from 0-3).
-        self.populate_directions(2 * self.level_num + 3)
+        self.populate_directions(self.get_num_directions())
 
         # Convert the directions to paths.
         self.populate_paths()
@@ -207,51 +268,106 @@ class Level(object):
         # Add pass-through room areas.
         self.add_pass_through_rooms(abs(len(self.paths) - 2))
 
+    def generate(self, game=None):
+        """ (None, Game) -> None
+        Generate a pseudorandom world with the given Game instance.
+        """
+        if game is not None:
+            self.screen_w = game.screen_w
+            self.screen_h = game.screen_h
+
+        # Lay out the rooms and paths.
+        self.generate_layout()
+
         # Cache level object Surfaces
         self.populate_output_surfaces()
 
+        # Lay a navigation grid over the level for the enemies to follow.
+        self.build_navigation()
+
         # Prepare game objects.
         self.initialize_player()
-        enemy_sheet = Spritesheet('zombiebasic.png', 4, 3)
-        regular_zombie_images = list(enemy_sheet[0:3]) + list(enemy_sheet[4:7])
-        weak_zombie_images = [load_image('zombie.png')]
+        self.starving_frames = 0
+        self.load_sprites()
         num_enemies = len(self.rooms) * 2
-        self.enemies = []
+        self.entities.remove_all(ENEMY)
         for x, y in self.get_multiple_enemy_locations(num_enemies):
-            if randint(0, 1):
-                self.enemies.append(Enemy(x, y, 4, *regular_zombie_images))
-                self.enemies[-1].health = randint(2, 3) * 50
-            else:
-                self.enemies.append(Enemy(x, y, 5, *weak_zombie_images))
-                self.enemies[-1].health = 50
-        self.lock = Lock(self.endpoint[0], self.endpoint[1], 'lock_blue.png')
+            self.spawn_enemy(x, y)
+        self.entities.remove_all(ENDING)
+        self.lock = self.entities.add(Lock(self.endpoint[0], self.endpoint[1], 'lock_blue.png'), ENDING)
 
         # Add food and pickups
-        self.items = []
+        self.entities.remove_all(ITEM)
         num_foods, num_health_packs, num_ammo_packs = 3 * len(self.rooms) // 2, \
                                                       len(self.rooms) // 2, len(self.rooms) // 3 + 1
-        food_images = Spritesheet('food.png', 14, 8)    # Spritesheet object for food items
-        food_images *= 1.4                              # Enlarge the spritesheet
-        icon_images = Spritesheet('icons.png', 3, 2)    # Spritesheet object for icons
-        icon_images *= 1.5
-        health_pack_image = icon_images[0]              # Extract the health pack image
-        ammo_pack_image = load_image('ammo.png')
         for i in range(num_foods):
-            image = choice(food_images[:])
+            image = choice(self.food_images)
             self.add_item(image)
         for i in range(num_health_packs):
-            self.add_item(health_pack_image, 'health')
+            self.add_item(self.health_pack_image, 'health')
         for i in range(num_ammo_packs):
-            self.add_item(ammo_pack_image, 'ammo')
-        self.blood = []
-        self.blood_images = enemy_sheet[10], enemy_sheet[9]     # Large and small blood splatter
+            self.add_item(self.ammo_pack_image, 'ammo')
+        self.splatter_pool.release_all(self.entities.remove_all(BLOOD))
 
         # Add a key
         image = load_image('keyblue.png')
         room = choice(self.rooms)
         x = randint(room.left, room.right - image.get_width())
         y = randint(room.top, room.bottom - image.get_height())
-        self.key = Key(x, y, image)
+        self.key = self.entities.add(Key(x, y, image), ENDING)
+
+    def build_navigation(self):
+        """ (None) -> None
+        Build the navigation grid, flow field, region index, collision resolver and field of view
+        for the current rooms and paths. Call again whenever the rooms or paths change.
+        """
+        self.grid = self.create_grid()
+        self.flow_field = FlowField(self.grid, CHASE_DISTANCE)
+        self.region_index = RegionIndex(self.paths + self.rooms, self.grid)
+        self.collision_resolver = CollisionResolver(self.geometry.floors)
+        self.field_of_view = FieldOfView(self.grid, self.paths + self.rooms)
+        if self.fog is None:
+            self.fog = self.entities.add(Fog(self.field_of_view, self.screen_w, self.screen_h), FOG)
+        else:
+            self.fog.set_field_of_view(self.field_of_view)
+
+    def create_grid(self):
+        """ (None) -> LevelGrid
+        Return a navigation grid over the current rooms and paths.
+        """
+        return LevelGrid(self.paths + self.rooms, self.path_width // 4)
+
+    def load_sprites(self):
+        """ (None) -> None
+        Load the images used for enemies, items, and blood splatter.
+        """
+        enemy_sheet = Spritesheet('zombiebasic.png', 4, 3)
+        self.regular_zombie_images = list(enemy_sheet[0:3]) + list(enemy_sheet[4:7])
+        self.weak_zombie_images = [load_image('zombie.png')]
+        self.blood_images = enemy_sheet[10], enemy_sheet[9]     # Large and small blood splatter
+        food_images = Spritesheet('food.png', 14, 8, 1.4)   # Enlarged spritesheet object for food items
+        self.food_images = food_images[:]
+        icon_images = Spritesheet('icons.png', 3, 2, 1.5)   # Enlarged spritesheet object for icons
+        self.health_pack_image = icon_images[0]         # Extract the health pack image
+        self.ammo_pack_image = load_image('ammo.png')
+
+    def spawn_enemy(self, x, y):
+        """ (int, int) -> Enemy
+        Add a randomly chosen type of enemy at the given co-ordinates and return it.
+        """
+        if randint(0, 1):
+            enemy = Enemy(x, y, 4, *self.regular_zombie_images)
+            enemy.health = randint(2, 3) * 50
+        else:
+            enemy = Enemy(x, y, 5, *self.weak_zombie_images)
+            enemy.health = 50
+        return self.entities.add(enemy, ENEMY)
+
+    def is_complete(self):
+        """ (None) -> bool
+        Return True if the player has made it through the last level, False otherwise.
+        """
+        return self.level_num > LAST_LEVEL
 
     def shift(self, dx, dy):
         """ (int, int) -> None
@@ -259,9 +375,21 @@ class Level(object):
         """
         for rect in self.paths + self.rooms:
             rect.move_ip(dx, dy)
-        for thing in self.blood + self.enemies + self.items + self.bullets + [self.lock] + [self.key]:
-            thing.shift(dx, dy)
+        self.geometry.shift(dx, dy)
+        self.grid.shift(dx, dy)
+        self.minimap.shift(dx, dy)
+        self.enemy_hash.shift(dx, dy)
+        shift_system(self.entities, dx, dy)
 
+    def resize(self, w, h):
+        """ (int, int) -> None
+        Change the screen size to the given width and height, keeping the player at the center.
+        """
+        self.shift(w // 2 - self.screen_w // 2, h // 2 - self.screen_h // 2)
+        self.screen_w, self.screen_h = w, h
+        self.fog.resize(w, h)
+        self.player.x, self.player.y = w // 2, h // 2
+        self.player.rect = self.player.get_rect()
 
     def get_multiple_enemy_locations(self, x):
         """ (int) -> list
@@ -294,17 +422,18 @@ class Level(object):
             player_spritesheet = Spritesheet('player.png', 2, 4)
             self.player = Player(self.screen_w // 2, self.screen_h // 2, 7, *player_spritesheet[0:6])
             self.player.set_aiming_image(player_spritesheet[6])
+        if not self.entities.has(self.player):
+            self.entities.add(self.player, PLAYER)
 
     def update_player(self):
         """ (None) -> None
         Update the player object based on user inputs.
         """
         # Gather info
-        should_shoot = pygame.mouse.get_pressed()[0] and not self.mouse_buttons[0]
-        self.keys = pygame.key.get_pressed()
-        self.mouse_buttons = pygame.mouse.get_pressed()
-        up, down, left, right = self.keys[K_w], self.keys[K_s], self.keys[K_a], self.keys[K_d]
-        self.player.aiming = pygame.mouse.get_pressed()[-1]
+        keys, mouse_pos = self.inputs.keys, self.inputs.mouse_pos
+        should_shoot = 0 in self.inputs.buttons_pressed
+        up, down, left, right = keys[K_w], keys[K_s], keys[K_a], keys[K_d]
+        self.player.aiming = self.inputs.mouse_buttons[-1]
 
         # Set the player's direction
         if left: self.player.set_direction(LEFT)
@@ -315,77 +444,66 @@ class Level(object):
 
         # Override the player's direction if they're aiming
         if self.player.aiming:
-            self.player.rotate(pygame.mouse.get_pos()[0], pygame.mouse.get_pos()[1])
+            self.player.rotate(mouse_pos[0], mouse_pos[1])
             self.player.set_speed()
         # Shoot a bullet if the player presses the left mouse button - decrease ammo and food as well
         if self.player.aiming and should_shoot and self.ammo > 0:
-            self.bullets.append(Bullet(BLACK, self.player.x, self.player.y, 16, self.player.angle))
+            self.entities.add(self.bullet_pool.acquire(BLACK, self.player.x, self.player.y, 16, self.player.angle),
+                              BULLET)
+            self.telemetry.record(EVENT_SHOT)
             self.player.hunger += 0.05
             self.ammo = max(0, self.ammo - 1)
 
         # Update the player and obtain the new speed to shift the level
+        self.handle_wall_collision(self.player)
         self.player.update()
         vx, vy = self.player.get_speed()
         vx, vy = -vx, -vy
         self.shift(vx, vy)
 
         # Start reducing health when hunger gets high
-        if self.player.hunger >= HUNGER_LIMIT and randint(0, 75) == 0:
-            self.player.health -= 5
-
-    def rebound_character(self, character, stopdir=LEFT):
-        """ (Character, [int]) -> None
-        Handle wall collisions that require the character to no longer go in the given
-        stop direction.
-        """
-        if stopdir == LEFT:
-            vx = character.top_speed
-            vy = 0
-        elif stopdir == RIGHT:
-            vx = -character.top_speed
-            vy = 0
-        elif stopdir == DOWN:
-            vx = 0
-            vy = -character.top_speed
-        else:
-            vx = 0
-            vy = character.top_speed
-        character.image_counter = 0
-        if not isinstance(character, Player):
-            character.shift(vx, vy)
+        if self.player.hunger >= HUNGER_LIMIT:
+            self.starving_frames += 1
+            self.scheduler.submit('starve', self.starve)
+
+    def starve(self):
+        """ (None) -> None
+        Roll for starvation damage once for every frame that the player spent starving since the
+        last roll. Low-priority, so it runs on the scheduler.
+        """
+        for i in range(self.starving_frames):
+            if randint(0, 75) == 0:
+                self.player.health -= 5
+                self.telemetry.record(EVENT_DAMAGE, 5, detail=1)
+        self.starving_frames = 0
+
+    def move_character(self, character, dx, dy):
+        """ (Character, float, float) -> None
+        Move the given Character by the given increments, stopping at walls.
+        The level is shifted instead when the Character is the player.
+        """
+        dx, dy = self.collision_resolver.move(character.get_hitbox(), dx, dy)
+        if character is self.player:
+            self.shift(-dx, -dy)
         else:
-            self.shift(-vx, -vy)
+            character.shift(dx, dy)
 
     def handle_wall_collision(self, character):
         """ (Character) -> None
-        Check and react to collisions between the given Character and all walls.
-        """
-        character.possible_directions = [i for i in xrange(4)]
-        e = self.is_collision(character.get_east())
-        ne = self.is_collision(character.get_north_east())
-        n = self.is_collision(character.get_north())
-        nw = self.is_collision(character.get_north_west())
-        w = self.is_collision(character.get_west())
-        sw = self.is_collision(character.get_south_west())
-        s = self.is_collision(character.get_south())
-        se = self.is_collision(character.get_south_east())
-        if w or sw or nw:
-            self.rebound_character(character, LEFT)
-        if n or ne or nw:
-            self.rebound_character(character, UP)
-        if ne or e or se:
-            self.rebound_character(character, RIGHT)
-        if s or sw or se:
-            self.rebound_character(character, DOWN)
+        Clip the velocity of the given Character so that its next update keeps it off the walls.
+        Call before the Character is updated.
+        """
+        character.vx, character.vy = self.collision_resolver.move(character.get_hitbox(),
+                                                                  character.vx, character.vy)
 
     def handle_pickups(self):
         """ (None) -> None
-        Check for and react to collisions with items
+        Check for and react to collisions with items, removing the items that are picked up.
         """
-        for item in self.items:
-            if not item.is_alive() or not self.player.collides_with(item):
-                continue
+        for item in collision_system(self.entities, PICKUP, self.player.rect):
             item.destroy()
+            self.entities.remove(item)
+            self.telemetry.record(EVENT_PICKUP, detail=ITEM_TYPES.index(item.type))
             if item.type == 'food':
                 self.player.hunger -= 3
                 self.player.hunger = max(self.player.hunger, 0)
@@ -400,89 +518,194 @@ class Level(object):
         """
         if character.collides_with(self.player):
             self.player.health -= character.damage
-            self.shift(self.player.vx, self.player.vy)
-            character.shift(-2 * character.vx, -2 * character.vy)
-            self.blood.append(Splatter(self.player.x, self.player.y, self.blood_images[1]))
-        if len(self.blood) > 25:
-            self.blood.pop(0)
+            self.telemetry.record(EVENT_DAMAGE, character.damage)
+            self.move_character(self.player, -self.player.vx, -self.player.vy)
+            self.move_character(character, -2 * character.vx, -2 * character.vy)
+            self.add_splatter(self.player.x, self.player.y, self.blood_images[1])
+
+    def add_splatter(self, x, y, image):
+        """ (int, int, Surface) -> None
+        Add blood splatter with the given image at the given co-ordinates. The oldest splatter
+        is removed later if there is too much.
+        """
+        self.entities.add(self.splatter_pool.acquire(x, y, image), BLOOD)
+        if len(self.blood) > MAX_BLOOD:
+            self.scheduler.submit('trim blood', self.trim_blood)
 
-    def update(self):
+    def trim_blood(self):
         """ (None) -> None
-        Update the state of the Level.
+        Remove the oldest blood splatter until there is no more than the most allowed.
+        Low-priority, so it runs on the scheduler.
+        """
+        while len(self.blood) > MAX_BLOOD:
+            oldest = self.blood[0]
+            self.entities.remove(oldest)
+            self.splatter_pool.release(oldest)
+
+    def update_items(self):
+        """ (None) -> None
+        Snap the Rects of the items back to their co-ordinates, which shifting by fractions of a
+        pixel moves apart. Low-priority, so it runs on the scheduler.
+        """
+        for item in self.items:
+            item.update()
+
+    def update_enemy(self, enemy, player_region, interval=1, force=(0, 0)):
+        """ (Enemy, int, [int], [tuple]) -> None
+        Update the given enemy to cover the given number of frames. Enemies notice the player when
+        they share a room or path, and then follow the flow field toward the player until they
+        fall out of its range, steered by the given crowd force without going over their top speed.
+        """
+        if player_region >= 0 and self.region_index.update(enemy) == player_region:
+            enemy.alerted = True
+        if enemy.alerted:
+            waypoint = self.flow_field.get_waypoint(enemy.x, enemy.y)
+            if waypoint is None:
+                enemy.alerted = False
+                enemy.vx = enemy.vy = 0
+            else:
+                enemy.move_to_target(*waypoint)
+                enemy.vx += force[0]
+                enemy.vy += force[1]
+                speed = math.hypot(enemy.vx, enemy.vy)
+                if speed > enemy.top_speed:
+                    enemy.vx *= enemy.top_speed / speed
+                    enemy.vy *= enemy.top_speed / speed
+                enemy.vx *= interval
+                enemy.vy *= interval
+        self.handle_wall_collision(enemy)
+        enemy.update()
+        self.collide_with_player(enemy)
+        self.enemy_hash.update(enemy)
+
+    def update(self, inputs=NO_INPUT):
+        """ ([InputSnapshot]) -> None
+        Update the state of the Level with the given inputs for this frame, or with the
+        inputs of the controller if there is one.
         """
+        self.inputs = self.controller.get_input(self) if self.controller is not None else inputs
         self.update_player()
-        self.handle_wall_collision(self.player)
         if self.player.get_speed() != (0, 0):
             self.player.hunger += 0.005
-
-        new_enemies = []
-        for enemy in self.enemies:
-            enemy.update()
-            everything = self.paths + self.rooms
-            if self.player.rect.collidelist(everything) == enemy.rect.collidelist(everything):
-                enemy.move_to_target(self.player.x, self.player.y)
-            self.handle_wall_collision(enemy)
-            self.collide_with_player(enemy)
-            if enemy.health > 0:
-                new_enemies.append(enemy)
-            else:
-                self.blood.append(Splatter(enemy.x, enemy.y, self.blood_images[0]))
-        self.enemies = new_enemies
+        if self.telemetry.frame % TELEMETRY_HUNGER_INTERVAL == 0:
+            self.telemetry.record(EVENT_HUNGER, self.player.hunger)
+
+        # Update nearby enemies every frame, far-away enemies every few frames, and let the
+        # rest sleep until the player comes back within range. Enemies that have not noticed
+        # the player only move while the player can see them. Chasing enemies are steered
+        # away from each other.
+        self.field_of_view.update(self.player.x, self.player.y)
+        self.flow_field.update(self.player.x, self.player.y)
+        player_region = self.region_index.update(self.player)
+        self.lod.next_frame()
+        intervals = [self.lod.get_interval(enemy, self.player.x, self.player.y) for enemy in self.enemies]
+        forces = self.crowd.steer(self.enemies, [interval and enemy.alerted
+                                                 for enemy, interval in zip(self.enemies, intervals)])
+        dead = []
+        for enemy, interval, force in zip(self.enemies, intervals, forces):
+            if interval and (enemy.alerted or self.field_of_view.is_visible(enemy.x, enemy.y)):
+                self.update_enemy(enemy, player_region, interval, force)
+            if enemy.health <= 0:
+                dead.append(enemy)
+        for enemy in dead:
+            self.entities.remove(enemy)
+            self.telemetry.record(EVENT_KILL)
+            self.add_splatter(enemy.x, enemy.y, self.blood_images[0])
 
         self.handle_pickups()
 
-        for item in self.items + [self.key]:
-            item.update()
+        update_system(self.entities)
+        self.scheduler.submit('update items', self.update_items)
         if self.key and self.player.collides_with(self.key):
             self.key.visible = False
             self.lock.unlock()
-        if not self.lock.locked and self.player.collides_with(self.lock):
-            pygame.time.delay(1000)
-            self.increment()
+        if self.lock and not self.lock.locked and self.player.collides_with(self.lock):
+            if self.on_exit is not None:
+                self.on_exit()
+            else:
+                self.increment()
 
+        # Cast each bullet along its path for this frame so that fast bullets cannot skip
+        # through enemies or walls, and damage the first enemy hit before any wall.
         enemy_rects = [enemy.rect for enemy in self.enemies]
-        bullets = []
+        rects = self.geometry.floors
+        spent = []
         for bullet in self.bullets:
-            index = bullet.rect.collidelist(enemy_rects)
-            if index > -1:
-                self.enemies[index].health -= bullet.damage
-                continue
-            if not (0 <= bullet.x <= self.screen_w and 0 <= bullet.y <= self.screen_h) or \
-                    self.is_collision((bullet.x, bullet.y)):
+            if not (0 <= bullet.x <= self.screen_w and 0 <= bullet.y <= self.screen_h):
+                spent.append(bullet)
                 continue
-            bullet.update()
-            bullets.append(bullet)
-        self.bullets = bullets
+            wall = get_exit_fraction(rects, bullet.x, bullet.y, bullet.vx, bullet.vy)
+            hit, index = get_first_hit(enemy_rects, bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.radius)
+            if index > -1 and hit <= wall:
+                self.enemies[index].health -= bullet.damage
+                self.telemetry.record(EVENT_HIT, bullet.damage)
+                spent.append(bullet)
+            elif wall < 1:
+                spent.append(bullet)
+            else:
+                bullet.update()
+        for bullet in spent:
+            self.entities.remove(bullet)
+            self.bullet_pool.release(bullet)
 
     @staticmethod
-    def tile(source, dest, rect):
-        """ (Surface, Surface, Rect) -> None
+    def tile(source, dest, rect, origin=None):
+        """ (Surface, Surface, Rect, [tuple]) -> None
         Completely tile the given destination surface with tiles of the source surface, within the bounds
-        specified by the rect argument.
+        specified by the rect argument. Tiles are lined up with a tile whose top-left corner is at the
+        given origin (the top-left corner of the rect by default).
         """
-        for x in xrange(rect.left, rect.right, source.get_width()):
-            for y in xrange(rect.top, rect.bottom, source.get_height()):
+        if origin is None:
+            origin = rect.topleft
+        left = rect.left - (rect.left - origin[0]) % source.get_width()
+        top = rect.top - (rect.top - origin[1]) % source.get_height()
+        for x in xrange(left, rect.right, source.get_width()):
+            for y in xrange(top, rect.bottom, source.get_height()):
                 dest.blit(source, (x, y), (0, 0, rect.right - x, rect.bottom - y))
 
-    def draw(self, surface):
-        """ (Surface) -> None
-        Draw all level objects onto the given Surface.
+    def draw(self, surface, batched=True):
+        """ (Surface, [bool]) -> None
+        Draw all level objects onto the given Surface. If batched is True, the blits are collected
+        in a render queue and submitted together (with a plain blit loop where Pygame does not
+        provide Surface.blits()), and if it is False, each object blits directly.
         """
-        # Get a list of every Rect that represents a room or hallway.
-        rects = self.paths + self.rooms
-
-        # Iterate through all of the cached wall surfaces and blit them.
-        for i in range(len(rects)):
-            surface.blit(self.wall_surfaces[i], rects[i].inflate([2 * self.wall_width] * 2))
-
-        # Iterate through all of the cached floor surfaces and blit them - smaller than the wall surfaces
-        # due to the lack of a border.
-        for i in range(len(rects)):
-            surface.blit(self.floor_surfaces[i], rects[i])
-
-        # Draw enemies, items, and bullets
-        for item in self.blood + [self.lock] + self.items + [self.key] + self.enemies + self.bullets:
-            item.draw(surface)
-
-        # Draw player
-        self.player.draw(surface)
\ No newline at end of file
+        queue = None
+        if batched:
+            if self.render_queue is None or self.render_queue.surface is not surface:
+                self.render_queue = RenderQueue(surface)
+            queue = self.render_queue
+
+        # Pair every disjoint wall and floor Rect with its cached surface. The Rects never overlap,
+        # so each pixel of the level is painted exactly once.
+        tiles = zip(self.wall_surfaces, self.geometry.walls) + zip(self.floor_surfaces, self.geometry.floors)
+        if queue is not None:
+            queue.layer = TILE_LAYER
+            queue.extend(tiles)
+        else:
+            for tile in tiles:
+                surface.blit(*tile)
+
+        # Draw the on-screen blood, items, visible enemies, fog, bullets, and the player, each on
+        # their own layer
+        render_system(self.entities, queue if queue is not None else surface, surface.get_rect(),
+                      self.inputs.mouse_pos, queue, self.field_of_view)
+        if queue is not None:
+            queue.flush()
+
+    def draw_minimap(self, surface, topleft):
+        """ (Surface, tuple) -> None
+        Draw the minimap onto the given Surface with its top-left corner at the given co-ordinates.
+        It marks the player, the lock and key, and the nearby enemies that the player can see.
+        """
+        markers = []
+        if self.lock is not None:
+            markers.append(self.lock.rect.center + (BLUE, 3))
+        if self.key is not None and self.key.visible:
+            markers.append(self.key.rect.center + (YELLOW, 3))
+        area = pygame.Rect(0, 0, 2 * MINIMAP_RANGE, 2 * MINIMAP_RANGE)
+        area.center = self.player.x, self.player.y
+        for enemy in self.enemy_hash.query(area):
+            if self.field_of_view.is_visible(enemy.x, enemy.y):
+                markers.append((enemy.x, enemy.y, RED, 2))
+        markers.append((self.player.x, self.player.y, GREEN, 3))
+        self.minimap.draw(surface, topleft, markers)
\ No newline at end of file
@@ -0,0 +1,56 @@
+#####################################
+# Filename: lod.py
+# Description: Level-of-detail scheduler for enemy updates
+#####################################
+
+from constants import *
+
+
+class LODScheduler(object):
+    """ Decides how often each enemy is updated based on its distance from the player. """
+
+    def __init__(self, rates=LOD_RATES):
+        """ ([tuple]) -> LODScheduler
+        Instantiate a scheduler with the given table of (distance, interval) pairs. Enemies
+        within a distance are updated once every interval frames, and enemies beyond the
+        largest distance sleep until the player comes back within range.
+        """
+        self.rates = sorted((distance ** 2, interval) for distance, interval in rates)
+        self.frame = 0
+        self.active = 0         # Enemies updated every frame during the last frame
+        self.reduced = 0        # Enemies updated at a reduced rate during the last frame
+        self.sleeping = 0       # Enemies out of range during the last frame
+
+    def next_frame(self):
+        """ (None) -> None
+        Advance to the next frame and reset the per-frame statistics.
+        """
+        self.frame += 1
+        self.active = self.reduced = self.sleeping = 0
+
+    def get_interval(self, enemy, x, y):
+        """ (Enemy, int, int) -> int
+        Return the number of frames that the given enemy should cover if it is updated this frame
+        while the player is at the given co-ordinates. Return 0 if the enemy should be skipped.
+        """
+        distance = (enemy.x - x) ** 2 + (enemy.y - y) ** 2
+        for limit, interval in self.rates:
+            if distance <= limit:
+                break
+        else:
+            self.sleeping += 1
+            return 0
+        if interval <= 1:
+            self.active += 1
+            return 1
+        self.reduced += 1
+        # Spread the updates of enemies at the same rate over different frames.
+        if (self.frame + id(enemy) // 16) % interval:
+            return 0
+        return interval
+
+    def get_stats(self):
+        """ (None) -> dict
+        Return the number of active, reduced-rate and sleeping enemies during the last frame.
+        """
+        return {'active': self.active, 'reduced': self.reduced, 'sleeping': self.sleeping}
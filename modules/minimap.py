@@ -0,0 +1,52 @@
+#####################################
+# Filename: minimap.py
+# Description: Small map of the rooms and paths of a level with markers for the
+#               player, the lock and key, and nearby enemies
+#####################################
+
+from constants import *
+
+
+class Minimap(object):
+    """ Map of a level that is drawn from the room and path Rects once, and only has its markers
+    redrawn every frame. """
+
+    def __init__(self, rects, size=MINIMAP_SIZE):
+        """ (list, [int]) -> Minimap
+        Instantiate a map of the given room and path Rects that is at most the given number of
+        pixels wide and tall.
+        """
+        self.bounds = rects[0].unionall(rects[1:])     # On-screen area of the level, moves with it
+        self.scale = float(size) / max(self.bounds.width, self.bounds.height)
+        self.image = pygame.Surface((max(1, int(self.bounds.width * self.scale)),
+                                     max(1, int(self.bounds.height * self.scale)))).convert()
+        self.image.fill(MINIMAP_BACKGROUND)
+        for rect in rects:
+            self.image.fill(MINIMAP_FLOOR, self.to_map(rect.left, rect.top) +
+                            (max(1, int(rect.width * self.scale)), max(1, int(rect.height * self.scale))))
+        pygame.draw.rect(self.image, WHITE, self.image.get_rect(), 1)
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Move the mapped area along with the rest of the level.
+        """
+        self.bounds.move_ip(dx, dy)
+
+    def to_map(self, x, y):
+        """ (int, int) -> tuple
+        Return the co-ordinates on the map of the given on-screen point.
+        """
+        return int((x - self.bounds.left) * self.scale), int((y - self.bounds.top) * self.scale)
+
+    def draw(self, surface, topleft, markers):
+        """ (Surface, tuple, list) -> None
+        Draw the map onto the given Surface with its top-left corner at the given co-ordinates,
+        with a marker for each of the given (x, y, colour, radius) tuples on top.
+        """
+        surface.blit(self.image, topleft)
+        clip = surface.get_clip()
+        surface.set_clip(pygame.Rect(topleft, self.image.get_size()))
+        for x, y, colour, radius in markers:
+            mx, my = self.to_map(x, y)
+            pygame.draw.circle(surface, colour, (topleft[0] + mx, topleft[1] + my), radius)
+        surface.set_clip(clip)
@@ -0,0 +1,86 @@
+#####################################
+# Filename: navigation.py
+# Description: Flow field shared by every enemy chasing the player
+#####################################
+
+from collections import deque
+
+
+class FlowField(object):
+    """ Breadth-first flow field over a LevelGrid that leads every cell toward a single target. """
+
+    def __init__(self, grid, max_distance=40):
+        """ (LevelGrid, [int]) -> FlowField
+        Instantiate an empty flow field over the given grid. Cells further than
+        max_distance steps from the target are left unreachable.
+        """
+        self.grid = grid
+        self.max_distance = max_distance
+        self.distance = [-1] * len(grid)    # Number of steps from each cell to the target cell
+        self.next_cell = [-1] * len(grid)   # Neighbouring cell that is one step closer to the target
+        self.reached = []                   # Cells reached by the last search (reset on the next one)
+        self.target = -1                    # Index of the target cell
+        self.target_x = 0                   # Exact on-screen co-ordinates of the target
+        self.target_y = 0
+
+    def update(self, x, y):
+        """ (int, int) -> bool
+        Point the flow field at the given on-screen co-ordinates. The field is only rebuilt
+        when the target moves into a different cell. Return True if the field was rebuilt.
+        """
+        self.target_x, self.target_y = x, y
+        cell = self.grid.locate(x, y)
+        if cell == self.target:
+            return False
+        for index in self.reached:
+            self.distance[index] = -1
+            self.next_cell[index] = -1
+        self.reached = []
+        self.target = cell
+        if cell < 0:
+            return True
+
+        # Breadth-first search outward from the target cell.
+        distance, next_cell, neighbours = self.distance, self.next_cell, self.grid.neighbours
+        distance[cell] = 0
+        next_cell[cell] = cell
+        self.reached.append(cell)
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            steps = distance[current] + 1
+            if steps > self.max_distance:
+                continue
+            for index in neighbours[current]:
+                if distance[index] < 0:
+                    distance[index] = steps
+                    next_cell[index] = current
+                    self.reached.append(index)
+                    queue.append(index)
+        return True
+
+    def get_distance(self, x, y):
+        """ (int, int) -> int
+        Return the number of steps between the given on-screen point and the target,
+        or -1 if the target cannot be reached from there.
+        """
+        cell = self.grid.locate(x, y)
+        if cell < 0:
+            return -1
+        return self.distance[cell]
+
+    def get_waypoint(self, x, y):
+        """ (int, int) -> tuple
+        Return the on-screen co-ordinates to head toward from the given point in order to reach
+        the target, or None if the target cannot be reached from there.
+        """
+        cell = self.grid.locate(x, y)
+        if cell < 0 or self.distance[cell] < 0:
+            return None
+        if self.distance[cell] <= 1:
+            return self.target_x, self.target_y
+        # Look two cells ahead to smooth out the staircase of a 4-way search.
+        ahead = self.next_cell[self.next_cell[cell]]
+        if ahead == self.target:
+            return self.target_x, self.target_y
+        return self.grid.get_center(ahead)
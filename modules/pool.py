@@ -0,0 +1,49 @@
+#####################################
+# Filename: pool.py
+# Description: Pool of reusable objects for short-lived level entities
+#####################################
+
+
+class Pool(object):
+    """ Hands out instances of a class, reusing released instances instead of allocating new ones.
+    The class must have a reset() method that takes the same arguments as its constructor. """
+
+    def __init__(self, cls):
+        """ (type) -> Pool
+        Instantiate an empty pool of instances of the given class.
+        """
+        self.cls = cls
+        self.free = []          # Released instances that are ready to be reused
+        self.created = 0        # Instances allocated by the pool
+        self.reused = 0         # Instances handed out again after being released
+
+    def acquire(self, *args):
+        """ (...) -> object
+        Return an instance initialized with the given constructor arguments.
+        """
+        if self.free:
+            instance = self.free.pop()
+            instance.reset(*args)
+            self.reused += 1
+            return instance
+        self.created += 1
+        return self.cls(*args)
+
+    def release(self, instance):
+        """ (object) -> None
+        Return the given instance to the pool. It must not be used again until it is acquired.
+        """
+        self.free.append(instance)
+
+    def release_all(self, instances):
+        """ (list) -> None
+        Return every instance in the given list to the pool and empty the list.
+        """
+        self.free.extend(instances)
+        del instances[:]
+
+    def get_stats(self):
+        """ (None) -> dict
+        Return the number of instances that were allocated, reused, and are waiting to be reused.
+        """
+        return {'created': self.created, 'reused': self.reused, 'free': len(self.free)}
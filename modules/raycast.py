@@ -0,0 +1,71 @@
+#####################################
+# Filename: raycast.py
+# Description: Continuous collision tests for fast-moving points such as bullets
+#####################################
+
+import pygame
+
+
+def clip_segment(rect, x, y, dx, dy):
+    """ (Rect, float, float, float, float) -> tuple
+    Return the (enter, exit) fractions of the segment from (x, y) to (x + dx, y + dy) that lie
+    inside the given Rect, or None if the segment misses the Rect.
+    """
+    enter, leave = 0.0, 1.0
+    for direction, distance in ((-dx, x - rect.left), (dx, rect.right - x),
+                                (-dy, y - rect.top), (dy, rect.bottom - y)):
+        if direction == 0:
+            if distance < 0:
+                return None
+            continue
+        t = float(distance) / direction
+        if direction < 0:
+            if t > leave:
+                return None
+            enter = max(enter, t)
+        else:
+            if t < enter:
+                return None
+            leave = min(leave, t)
+    return enter, leave
+
+
+def get_sweep(x, y, dx, dy, padding=0):
+    """ (float, float, float, float, [int]) -> Rect
+    Return the bounding Rect of the segment from (x, y) to (x + dx, y + dy), grown by padding.
+    """
+    result = pygame.Rect(int(min(x, x + dx)), int(min(y, y + dy)), int(abs(dx)) + 2, int(abs(dy)) + 2)
+    return result.inflate(2 * padding, 2 * padding)
+
+
+def get_exit_fraction(rects, x, y, dx, dy):
+    """ (list, float, float, float, float) -> float
+    Return the fraction of the segment from (x, y) to (x + dx, y + dy) that can be travelled
+    before leaving the floor covered by the given Rects. A value of 1.0 or more means that the
+    whole segment is on the floor; 0.0 means that the segment starts inside a wall.
+    """
+    spans = []
+    for index in get_sweep(x, y, dx, dy).collidelistall(rects):
+        span = clip_segment(rects[index], x, y, dx, dy)
+        if span is not None:
+            spans.append(span)
+    spans.sort()
+    result = 0.0
+    for enter, leave in spans:
+        if enter > result:
+            break
+        result = max(result, leave)
+    return result
+
+
+def get_first_hit(rects, x, y, dx, dy, padding=0):
+    """ (list, float, float, float, float, [int]) -> tuple
+    Return the (fraction, index) of the first of the given Rects (grown by padding) hit by the
+    segment from (x, y) to (x + dx, y + dy), or (None, -1) if the segment hits nothing.
+    """
+    result = None, -1
+    for index in get_sweep(x, y, dx, dy, padding).collidelistall(rects):
+        span = clip_segment(rects[index].inflate(2 * padding, 2 * padding), x, y, dx, dy)
+        if span is not None and (result[0] is None or span[0] < result[0]):
+            result = span[0], index
+    return result
@@ -0,0 +1,52 @@
+#####################################
+# Filename: regions.py
+# Description: Index that maps points to the rooms and paths containing them
+#####################################
+
+
+class RegionIndex(object):
+    """ Grid-backed lookup of the room or path (region) that contains a point. """
+
+    def __init__(self, rects, grid):
+        """ (list, LevelGrid) -> RegionIndex
+        Instantiate an index over the given list of room and path Rects. Each Rect is identified
+        by its position in the list. The Rects must be the same objects that the level shifts.
+        """
+        self.regions = rects
+        self.grid = grid
+
+        # Bucket the ID of every region under each grid cell that it overlaps.
+        self.candidates = [()] * len(grid)
+        size, cols = grid.cell_size, grid.cols
+        for region, rect in enumerate(rects):
+            first_col = max(0, (rect.left - grid.origin_x) // size)
+            first_row = max(0, (rect.top - grid.origin_y) // size)
+            last_col = min(cols - 1, (rect.right - 1 - grid.origin_x) // size)
+            last_row = min(grid.rows - 1, (rect.bottom - 1 - grid.origin_y) // size)
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    index = row * cols + col
+                    self.candidates[index] = self.candidates[index] + (region,)
+
+    def get_region(self, x, y):
+        """ (int, int) -> int
+        Return the ID of the first region containing the given on-screen point, or -1 if the
+        point is inside a wall.
+        """
+        index = self.grid.get_cell(x, y)
+        if index < 0:
+            return -1
+        for region in self.candidates[index]:
+            if self.regions[region].collidepoint(x, y):
+                return region
+        return -1
+
+    def update(self, character):
+        """ (Character) -> int
+        Refresh and return the region ID cached on the given Character. The index is only
+        searched again once the Character leaves its cached region.
+        """
+        region = character.region
+        if not 0 <= region < len(self.regions) or not self.regions[region].collidepoint(character.x, character.y):
+            character.region = self.get_region(character.x, character.y)
+        return character.region
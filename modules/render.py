@@ -0,0 +1,70 @@
+#####################################
+# Filename: render.py
+# Description: Render queue that collects a frame's blits and submits them in
+#               one batch, in layer order
+#####################################
+
+from constants import *
+
+# Layers that the level is drawn in, from the bottom up
+TILE_LAYER = 0
+BLOOD_LAYER = 1
+ITEM_LAYER = 2
+ENEMY_LAYER = 3
+FOG_LAYER = 4
+BULLET_LAYER = 5
+PLAYER_LAYER = 6
+NUM_LAYERS = 7
+
+
+class RenderQueue(object):
+    """ Stand-in for a Surface that records blits instead of performing them. Objects with a
+    draw(surface) method can draw into a RenderQueue without any changes. """
+
+    def __init__(self, surface):
+        """ (Surface) -> RenderQueue
+        Instantiate an empty queue for blits onto the given Surface.
+        """
+        self.surface = surface
+        self.layers = [[] for i in range(NUM_LAYERS)]
+        self.layer = 0              # Layer that blit() adds to
+        self.count = 0              # Blits submitted by the last flush()
+
+    def get_rect(self):
+        """ (None) -> Rect
+        Return the boundaries of the destination Surface.
+        """
+        return self.surface.get_rect()
+
+    def blit(self, source, dest, area=None):
+        """ (Surface, Rect-or-tuple, [Rect]) -> None
+        Queue a blit of the given source Surface (or the given area of it) onto the current layer.
+        Same arguments as Surface.blit(), except for special flags.
+        """
+        if area is None:
+            self.layers[self.layer].append((source, dest))
+        else:
+            self.layers[self.layer].append((source, dest, area))
+
+    def extend(self, blits):
+        """ (iterable) -> None
+        Queue the given (source, dest) or (source, dest, area) tuples onto the current layer.
+        """
+        self.layers[self.layer].extend(blits)
+
+    def flush(self):
+        """ (None) -> None
+        Perform every queued blit from the bottom layer up and empty the queue. Uses a single
+        Surface.blits() call where Pygame provides it.
+        """
+        sequence = []
+        for layer in self.layers:
+            sequence.extend(layer)
+            del layer[:]
+        self.count = len(sequence)
+        if hasattr(self.surface, 'blits'):
+            self.surface.blits(sequence, 0)
+        else:
+            blit = self.surface.blit
+            for args in sequence:
+                blit(*args)
@@ -0,0 +1,78 @@
+#####################################
+# Filename: scheduler.py
+# Description: Cooperative scheduler that runs low-priority work in the time
+#               left over at the end of each frame
+#####################################
+
+import time
+from collections import deque
+from constants import *
+
+
+class FrameScheduler(object):
+    """ Queue of low-priority jobs that run in the time left in each frame's budget, oldest first.
+    A job only runs if its average run time fits in the time left, unless it has already waited
+    for the most frames allowed. Without a budget, every job runs when the scheduler runs. """
+
+    def __init__(self, budget=None, max_delay=SCHEDULER_MAX_DELAY):
+        """ ([float], [int]) -> FrameScheduler
+        Instantiate a scheduler for frames of the given number of milliseconds, or without a
+        budget, that lets jobs wait for at most the given number of frames.
+        """
+        self.budget = budget
+        self.max_delay = max_delay
+        self.jobs = deque()         # (name, function, args, submit time, submit frame) of each waiting job
+        self.pending = set()        # Names of the waiting jobs
+        self.frame = 0              # Number of times that the scheduler has run
+        self.stats = {}             # [runs, total latency, max latency, total run time] by job name,
+                                    # in milliseconds
+
+    def submit(self, name, function, *args):
+        """ (str, function, ...) -> bool
+        Queue a call of the given function with the given arguments under the given job name.
+        Return False without queuing anything if a job with the same name is already waiting.
+        """
+        if name in self.pending:
+            return False
+        self.pending.add(name)
+        self.jobs.append((name, function, args, time.time(), self.frame))
+        return True
+
+    def clear(self):
+        """ (None) -> None
+        Drop every waiting job, such as the jobs of a level that is being replaced.
+        """
+        self.jobs.clear()
+        self.pending.clear()
+
+    def run(self, frame_start=None):
+        """ ([float]) -> None
+        Run waiting jobs until the budget of the frame that started at the given time (as returned
+        by time.time()) is used up. Jobs submitted while running wait for the next frame.
+        """
+        self.frame += 1
+        for i in range(len(self.jobs)):
+            name, function, args, submitted, frame = self.jobs[0]
+            stats = self.stats.setdefault(name, [0, 0.0, 0.0, 0.0])
+            now = time.time()
+            if self.budget is not None and frame_start is not None and self.frame - frame < self.max_delay:
+                left = self.budget - 1000.0 * (now - frame_start)
+                if left <= 0 or stats[0] and stats[3] / stats[0] > left:
+                    return
+            self.jobs.popleft()
+            self.pending.discard(name)
+            function(*args)
+            latency = 1000.0 * (now - submitted)
+            stats[0] += 1
+            stats[1] += latency
+            stats[2] = max(stats[2], latency)
+            stats[3] += 1000.0 * (time.time() - now)
+
+    def get_stats(self):
+        """ (None) -> dict
+        Return the number of runs, and the mean and maximum milliseconds from submission to running
+        and mean milliseconds of running, of each job name.
+        """
+        return dict((name, {'runs': runs, 'mean_latency': latency / runs, 'max_latency': max_latency,
+                            'mean_time': run_time / runs})
+                    for name, (runs, latency, max_latency, run_time) in self.stats.items() if runs)
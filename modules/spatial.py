@@ -0,0 +1,84 @@
+#####################################
+# Filename: spatial.py
+# Description: Spatial hash that finds the level objects near a point without
+#               scanning all of them
+#####################################
+
+
+class SpatialHash(object):
+    """ Buckets objects by the square cell that contains their (x, y) co-ordinates. The cells are
+    fixed to the level, so shifting the level moves the hash without touching the buckets, and
+    an object only changes buckets when it moves into a different cell. """
+
+    def __init__(self, cell_size):
+        """ (int) -> SpatialHash
+        Instantiate an empty hash with cells of the given width and height.
+        """
+        self.cell_size = cell_size
+        self.origin_x = 0           # On-screen co-ordinates of the corner of cell (0, 0)
+        self.origin_y = 0
+        self.buckets = {}           # Lists of objects keyed by (column, row)
+        self.cells = {}             # (column, row) of the bucket of each object
+
+    def __len__(self):
+        return len(self.cells)
+
+    def get_cell(self, x, y):
+        """ (int, int) -> tuple
+        Return the (column, row) of the cell that contains the given on-screen point.
+        """
+        return int(x - self.origin_x) // self.cell_size, int(y - self.origin_y) // self.cell_size
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Move the hash along with the rest of the level.
+        """
+        self.origin_x += dx
+        self.origin_y += dy
+
+    def insert(self, thing):
+        """ (object) -> None
+        Add the given object, which has x and y attributes, to the bucket of its cell.
+        """
+        cell = self.get_cell(thing.x, thing.y)
+        self.cells[thing] = cell
+        self.buckets.setdefault(cell, []).append(thing)
+
+    def remove(self, thing):
+        """ (object) -> None
+        Remove the given object from the hash, if it is there.
+        """
+        cell = self.cells.pop(thing, None)
+        if cell is not None:
+            bucket = self.buckets[cell]
+            bucket.remove(thing)
+            if not bucket:
+                del self.buckets[cell]
+
+    def update(self, thing):
+        """ (object) -> None
+        Move the given object to the bucket of its current cell, if it left its old cell.
+        """
+        if self.cells.get(thing) != self.get_cell(thing.x, thing.y):
+            self.remove(thing)
+            self.insert(thing)
+
+    def clear(self):
+        """ (None) -> None
+        Remove every object from the hash.
+        """
+        self.buckets = {}
+        self.cells = {}
+
+    def query(self, rect):
+        """ (Rect) -> list
+        Return a list of the objects in the cells that the given on-screen Rect overlaps. Objects
+        near the edges of the Rect may be outside of it.
+        """
+        first_col, first_row = self.get_cell(rect.left, rect.top)
+        last_col, last_row = self.get_cell(rect.right - 1, rect.bottom - 1)
+        result = []
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                result.extend(self.buckets.get((col, row), ()))
+        return result
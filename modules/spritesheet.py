@@ -6,29 +6,43 @@
 #####################################
 from math import ceil, floor
 from data_loader import *
+from bundle import get_key
+
+_frames = {}    # Frames shared by every Spritesheet, keyed by (filename, images per row, images per column, scale, index)
 
 
 class Spritesheet(object):
 
-    def __init__(self, filename, num_in_row, num_in_col):
-        """ (str, int, int) -> Spritesheet
+    def __init__(self, filename, num_in_row, num_in_col, scale=1.0):
+        """ (str, int, int, [float]) -> Spritesheet
         Instantiate a spritesheet object with the given filename, width, height,
-        number of images per row, and number of images per column.
+        number of images per row, number of images per column, and scale factor.
+        Frames are only extracted the first time that any Spritesheet asks for them.
         """
-        self.image = load_image(filename)
-        self.width = self.image.get_width()
-        self.height = self.image.get_height()
+        self.filename = filename
         self.num_in_row = num_in_row
         self.num_in_column = num_in_col
-        self.frames = [self.get_frame(i) for i in range(self.num_in_row * self.num_in_column)]
-        self.optimize_images()
+        self.scale_factor = float(scale)
+        self.frames = []        # Frames added with add(), after the frames of the spritesheet image
 
     def __imul__(self, other):
         self.scale(float(other))
         return self
 
+    def __len__(self):
+        return self.num_in_row * self.num_in_column + len(self.frames)
+
     def __getitem__(self, index):
-        return self.frames[index]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index >= self.num_in_row * self.num_in_column:
+            return self.frames[index - self.num_in_row * self.num_in_column]
+        key = (self.filename, self.num_in_row, self.num_in_column, self.scale_factor, index)
+        if key not in _frames:
+            _frames[key] = self.extract_frame(index)
+        return _frames[key]
 
     def add(self, image):
         """ (Surface) -> None
@@ -45,34 +59,55 @@ class Spritesheet(object):
         """
         result = []
         for angle in range(0, 360, 90):
-            self.add(pygame.transform.rotate(self.frames[index], angle))
-            result.append(len(self.frames) - 1)
+            self.add(rotate_image(self[index], angle))
+            result.append(len(self) - 1)
         return result
 
-    def optimize_images(self):
-        """ (None) -> None
-        Remove transparent edges at each side of each frame in order to optimize them for blitting.
+    def get_bundle_key(self):
+        """ (None) -> str
+        Return the name of this spritesheet at its current scale in the asset bundle.
+        """
+        return get_key(self.filename, self.num_in_row, self.num_in_column, self.scale_factor)
+
+    def get_size(self):
+        """ (None) -> tuple
+        Return the (width, height) of the entire spritesheet image before scaling.
+        """
+        bundle = get_bundle()
+        if bundle is not None and self.get_bundle_key() in bundle:
+            return bundle.get_size(self.get_bundle_key())
+        return load_image(self.filename).get_size()
+
+    def extract_frame(self, i):
+        """ (int) -> Surface
+        Return the ith frame of the spritesheet image with its transparent edges removed
+        and scaled by the scale factor, taking it from the asset bundle if possible.
         """
-        new_frames = []
-        for image in self.frames:
-            new_frames.append(image.subsurface(image.get_bounding_rect()))
-        self.frames = new_frames
+        bundle = get_bundle()
+        if bundle is not None and self.get_bundle_key() in bundle:
+            return load_image(bundle.get_frame(self.get_bundle_key(), i))
+        image = self.get_frame(i)
+        image = image.subsurface(image.get_bounding_rect())     # Faster to blit without the transparent edges
+        if self.scale_factor != 1.0:
+            width, height = self.get_size()
+            w = float(width) / self.num_in_row
+            h = float(height) / self.num_in_column
+            image = pygame.transform.scale(image, (int(w * self.scale_factor), int(h * self.scale_factor)))
+        return image
 
     def get_frame(self, i):
         """ (int) -> Surface
         Return a Surface object representing the ith index of images in the Spritesheet.
         """
-        w = float(self.width) / self.num_in_row
-        h = float(self.height) / self.num_in_column
+        image = load_image(self.filename)
+        w = float(image.get_width()) / self.num_in_row
+        h = float(image.get_height()) / self.num_in_column
         x = (i % self.num_in_row) * w
         y = (i // self.num_in_row) * h
-        return self.image.subsurface(pygame.Rect(int(x), int(y), int(w), int(h)))
+        return image.subsurface(pygame.Rect(int(x), int(y), int(w), int(h)))
 
     def scale(self, factor):
         """ (float) -> None
         Resize the entire spritesheet image by the given factor (factor > 0.0).
         """
-        w = float(self.width) / self.num_in_row
-        h = float(self.height) / self.num_in_column
-        for i in range(len(self.frames)):
-            self.frames[i] = pygame.transform.scale(self.frames[i], (int(w * factor), int(h * factor)))
\ No newline at end of file
+        self.scale_factor = float(factor)
@@ -0,0 +1,45 @@
+#####################################
+# Filename: tasks.py
+# Description: Work that runs on a background thread while the game loop keeps going
+#####################################
+
+import sys, threading
+
+
+class BackgroundTask(object):
+    """ Function call that runs on its own thread. """
+
+    def __init__(self, function, *args):
+        """ (function, ...) -> BackgroundTask
+        Start calling the given function with the given arguments on a background thread.
+        """
+        self.value = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(function, args))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, function, args):
+        """ (function, tuple) -> None
+        Call the given function and keep its return value or exception. Runs on the background thread.
+        """
+        try:
+            self.value = function(*args)
+        except Exception:
+            self.error = sys.exc_info()
+
+    def done(self):
+        """ (None) -> bool
+        Return True if the function has returned or raised an exception, False otherwise.
+        """
+        return not self.thread.is_alive()
+
+    def result(self):
+        """ (None) -> object
+        Wait for the function to finish and return its return value. Exceptions raised
+        by the function are raised again on the calling thread.
+        """
+        self.thread.join()
+        if self.error is not None:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.value
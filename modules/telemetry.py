@@ -0,0 +1,138 @@
+#####################################
+# Filename: telemetry.py
+# Description: Gameplay events recorded into a fixed-size binary ring buffer
+#               that a background thread flushes to a log file
+#####################################
+
+import struct, threading
+from constants import *
+
+# ----- Events -----
+EVENT_SHOT = 0      # The player fired a bullet
+EVENT_HIT = 1       # A bullet hit an enemy, value is the damage
+EVENT_KILL = 2      # An enemy died
+EVENT_PICKUP = 3    # The player picked up an item, detail is its index in ITEM_TYPES
+EVENT_DAMAGE = 4    # The player took damage, value is the damage and detail is 0 for enemies, 1 for hunger
+EVENT_HUNGER = 5    # Sample of the player's hunger, value is the hunger
+EVENT_FRAME = 6     # A frame was shown, value is its time in milliseconds and detail is the level number
+EVENT_NAMES = ('shot', 'hit', 'kill', 'pickup', 'damage', 'hunger', 'frame')
+ITEM_TYPES = ('food', 'health', 'ammo')
+
+RECORD = struct.Struct('<IBBf')     # Frame number, event, detail and value of one event
+HEADER = struct.Struct('<4sBB')     # Magic bytes, format version and size of each record
+MAGIC = b'SUPT'
+VERSION = 1
+
+
+class Telemetry(object):
+    """ Records gameplay events into a preallocated ring buffer with one struct.pack_into() call
+    each, without allocating or waiting. A background thread periodically appends the recorded
+    events to a log file. Events that arrive while the buffer is full are dropped and counted.
+    Events must all be recorded from the same thread. """
+
+    def __init__(self, path, capacity=TELEMETRY_CAPACITY, interval=TELEMETRY_FLUSH_INTERVAL):
+        """ (str, [int], [float]) -> Telemetry
+        Instantiate telemetry that writes to a new log at the given path, buffers the given number
+        of events, and flushes them every given number of seconds.
+        """
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.frame = 0              # Number of the current frame
+        self.recorded = 0           # Events recorded so far; the next one goes in slot recorded % capacity
+        self.flushed = 0            # Events written to the log so far
+        self.dropped = 0            # Events dropped because the buffer was full
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.interval = interval
+        self.closing = threading.Event()
+        self.thread = threading.Thread(target=self.flush_periodically)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def record(self, event, value=0.0, detail=0):
+        """ (int, [float], [int]) -> None
+        Record the given event with the given value and detail during the current frame.
+        """
+        recorded = self.recorded
+        if recorded - self.flushed >= self.capacity:
+            self.dropped += 1
+            return
+        RECORD.pack_into(self.buffer, recorded % self.capacity * RECORD.size, self.frame, event, detail, value)
+        self.recorded = recorded + 1    # Only publish the event to the flushing thread once it is written
+
+    def next_frame(self, frame_time, level_num):
+        """ (float, int) -> None
+        Record that the current frame took the given number of milliseconds on the level with the
+        given number, and start the next frame.
+        """
+        self.record(EVENT_FRAME, frame_time, level_num & 0xff)
+        self.frame += 1
+
+    def flush(self):
+        """ (None) -> None
+        Append the events recorded since the last flush to the log. Only called by the flushing
+        thread, or once it has stopped.
+        """
+        recorded, size = self.recorded, RECORD.size
+        if recorded == self.flushed:
+            return
+        start, end = self.flushed % self.capacity, recorded % self.capacity
+        if start < end:
+            self.file.write(self.buffer[start * size:end * size])
+        else:
+            self.file.write(self.buffer[start * size:])
+            self.file.write(self.buffer[:end * size])
+        self.file.flush()
+        self.flushed = recorded
+
+    def flush_periodically(self):
+        """ (None) -> None
+        Flush the buffer every interval until the telemetry is closed. Runs on the background thread.
+        """
+        while not self.closing.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        """ (None) -> None
+        Stop the flushing thread, flush the remaining events and close the log.
+        """
+        self.closing.set()
+        self.thread.join()
+        self.flush()
+        self.file.close()
+        if self.dropped:
+            print('WARNING: %d telemetry events were dropped' % self.dropped)
+
+
+class NullTelemetry(object):
+    """ Telemetry that records nothing, for when telemetry is off. """
+
+    frame = 0
+
+    def record(self, event, value=0.0, detail=0):
+        pass
+
+    def next_frame(self, frame_time, level_num):
+        pass
+
+    def close(self):
+        pass
+
+
+NO_TELEMETRY = NullTelemetry()      # Used when no log was requested
+
+
+def read_log(path):
+    """ (str) -> generator
+    Yield the (frame, event, detail, value) tuple of every event in the log at the given path.
+    """
+    with open(path, 'rb') as f:
+        magic, version, size = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(path + ' is not a telemetry log of version %d' % VERSION)
+        while True:
+            data = f.read(size * 4096)
+            for offset in xrange(0, len(data) - size + 1, size):
+                yield RECORD.unpack_from(data, offset)
+            if len(data) < size * 4096:
+                return
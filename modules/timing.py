@@ -0,0 +1,44 @@
+#####################################
+# Filename: timing.py
+# Description: Wall-clock timings of named phases, such as the phases of startup
+#####################################
+
+import time
+
+
+class PhaseTimer(object):
+    """ Records how long after its creation each named phase finished. """
+
+    def __init__(self, name):
+        """ (str) -> PhaseTimer
+        Instantiate a timer with the given name and start timing.
+        """
+        self.name = name
+        self.start = time.time()
+        self.phases = []        # List of (phase name, seconds since start) tuples
+        self.reported = False
+
+    def mark(self, phase):
+        """ (str) -> None
+        Record that the phase with the given name has just finished.
+        """
+        self.phases.append((phase, time.time() - self.start))
+
+    def get_phase(self, phase):
+        """ (str) -> float
+        Return the number of seconds after the start at which the given phase finished,
+        or None if it has not been recorded.
+        """
+        for name, seconds in self.phases:
+            if name == phase:
+                return seconds
+        return None
+
+    def report(self):
+        """ (None) -> None
+        Print the recorded phases once, in the order that they finished.
+        """
+        if self.reported:
+            return
+        self.reported = True
+        print(self.name + ': ' + ', '.join('%s %.3fs' % phase for phase in sorted(self.phases, key=lambda p: p[1])))
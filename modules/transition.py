@@ -0,0 +1,93 @@
+#####################################
+# Filename: transition.py
+# Description: Fade between levels that keeps the game loop running while the
+#               next level is prepared on background threads
+#####################################
+
+from constants import *
+
+
+class Transition(object):
+    """ Fades the screen out, waits for background tasks to finish, and fades back in. The game loop
+    keeps drawing the transition every frame, so the window keeps responding in the meantime. """
+
+    def __init__(self, duration=TRANSITION_TIME):
+        """ ([int]) -> Transition
+        Instantiate an inactive transition that takes the given number of milliseconds to fade
+        out, and as long to fade back in.
+        """
+        self.duration = duration
+        self.tasks = []             # BackgroundTasks that have to finish before fading back in
+        self.snapshot = None        # Copy of the screen when the transition started
+        self.started = 0            # Time in milliseconds when the transition started
+        self.finished = None        # Time in milliseconds when the fade in started
+        self.overlay = None         # Black Surface that is blended over the screen
+
+    def start(self, surface, *tasks):
+        """ (Surface, ...) -> None
+        Start fading out of the current contents of the given Surface while the given
+        BackgroundTasks run.
+        """
+        self.snapshot = surface.copy()
+        self.tasks = list(tasks)
+        self.started = pygame.time.get_ticks()
+        self.finished = None
+        if self.overlay is None or self.overlay.get_size() != surface.get_size():
+            self.overlay = pygame.Surface(surface.get_size()).convert()
+            self.overlay.fill(BLACK)
+
+    def is_active(self):
+        """ (None) -> bool
+        Return True if the transition has started and not yet faded back in, False otherwise.
+        """
+        return self.snapshot is not None
+
+    def is_loading(self):
+        """ (None) -> bool
+        Return True until the tasks are done and the fade in starts. Whatever the tasks work
+        on must not be used while the transition is loading.
+        """
+        return self.is_active() and self.finished is None
+
+    def update(self):
+        """ (None) -> None
+        Start fading in once the screen has faded out and every task is done, and end the
+        transition once it has faded in. Exceptions raised by the tasks are raised again here.
+        """
+        now = pygame.time.get_ticks()
+        if self.finished is None:
+            if now - self.started >= self.duration and all(task.done() for task in self.tasks):
+                for task in self.tasks:
+                    task.result()
+                self.finished = now
+        elif now - self.finished >= self.duration:
+            self.snapshot = None
+            self.tasks = []
+
+    def get_darkness(self):
+        """ (None) -> int
+        Return the opacity of the black overlay for the current time, from 0 to 255.
+        """
+        if self.finished is None:
+            elapsed = pygame.time.get_ticks() - self.started
+            return min(255, 255 * elapsed // max(1, self.duration))
+        elapsed = pygame.time.get_ticks() - self.finished
+        return max(0, 255 - 255 * elapsed // max(1, self.duration))
+
+    def draw(self, surface, font):
+        """ (Surface, Font) -> None
+        Draw the transition onto the given Surface. While loading, the snapshot fades out and
+        a loading message in the given font appears once it is dark. Afterwards, the fade in is
+        blended over whatever is already on the Surface.
+        """
+        darkness = self.get_darkness()
+        if self.finished is None:
+            surface.blit(self.snapshot, (0, 0))
+        if darkness < 255:
+            self.overlay.set_alpha(darkness)
+            surface.blit(self.overlay, (0, 0))
+        else:
+            surface.fill(BLACK)
+        if self.finished is None and darkness == 255:
+            text = font.render('Loading...', 1, WHITE)
+            surface.blit(text, text.get_rect(center=surface.get_rect().center))
@@ -0,0 +1,204 @@
+#####################################
+# Filename: visibility.py
+# Description: Player's field of view over the level grid, and the fog that
+#               darkens the cells outside of it
+#####################################
+
+from constants import *
+
+
+class FieldOfView(object):
+    """ Cells of a LevelGrid that can be seen from the cell of a viewer, found with recursive
+    shadowcasting. Cells that are completely inside a wall block the view, but are seen themselves. """
+
+    # Transformations from the first octant to each of the eight octants around the viewer
+    octants = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+               (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+
+    def __init__(self, grid, rects, radius=VISION_RADIUS):
+        """ (LevelGrid, list, [int]) -> FieldOfView
+        Instantiate an empty field of view over the given grid of the given room and path Rects
+        that reaches the given number of cells from the viewer.
+        """
+        self.grid = grid
+        self.radius = radius
+
+        # Unlike walkable cells, a cell is see-through as long as any of it is floor, so that the
+        # partial cells along the walls do not block the view of a player standing next to them.
+        self.clear = bytearray(len(grid))
+        size = grid.cell_size
+        for rect in rects:
+            first_col = max(0, (rect.left - grid.origin_x) // size)
+            last_col = min(grid.cols - 1, (rect.right - 1 - grid.origin_x) // size)
+            first_row = max(0, (rect.top - grid.origin_y) // size)
+            last_row = min(grid.rows - 1, (rect.bottom - 1 - grid.origin_y) // size)
+            for row in range(first_row, last_row + 1):
+                start = row * grid.cols
+                self.clear[start + first_col:start + last_col + 1] = b'\x01' * max(0, last_col - first_col + 1)
+        self.visible = bytearray(len(grid))     # 1 for every visible cell
+        self.cells = []             # Indices of the visible cells
+        self.origin = -1            # Cell that the field of view was last computed from
+        self.version = 0            # Incremented every time that the visible cells change
+
+    def update(self, x, y):
+        """ (int, int) -> bool
+        Recompute the field of view for a viewer at the given on-screen co-ordinates if the
+        viewer is in a different cell than last time. Return True if it was recomputed.
+        """
+        index = self.grid.get_cell(x, y)
+        if index == self.origin:
+            return False
+        self.origin = index
+        for cell in self.cells:
+            self.visible[cell] = 0
+        self.cells = []
+        if index >= 0:
+            self.reveal(index)
+            col, row = index % self.grid.cols, index // self.grid.cols
+            for octant in self.octants:
+                self.cast(col, row, 1, 1.0, 0.0, octant)
+        self.version += 1
+        return True
+
+    def reveal(self, index):
+        """ (int) -> None
+        Mark the given cell as visible.
+        """
+        if not self.visible[index]:
+            self.visible[index] = 1
+            self.cells.append(index)
+
+    def cast(self, col, row, distance, start, end, octant):
+        """ (int, int, int, float, float, tuple) -> None
+        Reveal the cells of the given octant around the viewer's cell at (col, row) that lie
+        between the given start and end slopes, from the given distance outward. Recurses
+        into the gaps between the cells that block the view.
+        """
+        if start < end:
+            return
+        xx, xy, yx, yy = octant
+        cols, rows, clear = self.grid.cols, self.grid.rows, self.clear
+        radius_squared = self.radius ** 2
+        new_start = start
+        for j in range(distance, self.radius + 1):
+            dx, dy = -j - 1, -j
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                x, y = col + dx * xx + dy * xy, row + dx * yx + dy * yy
+                inside = 0 <= x < cols and 0 <= y < rows
+                if inside and dx * dx + dy * dy < radius_squared:
+                    self.reveal(y * cols + x)
+                opaque = not inside or not clear[y * cols + x]
+                if blocked:
+                    if opaque:
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif opaque and j < self.radius:
+                    blocked = True
+                    self.cast(col, row, j + 1, start, left_slope, octant)
+                    new_start = right_slope
+            if blocked:
+                break
+
+    def is_visible(self, x, y):
+        """ (int, int) -> bool
+        Return True if the cell that contains the given on-screen point is visible.
+        """
+        index = self.grid.get_cell(x, y)
+        return index >= 0 and self.visible[index] == 1
+
+
+class Fog(object):
+    """ Darkens the on-screen cells that are outside of a field of view. The fogged cells of each
+    row are merged into runs that are found again only when the field of view changes, and that
+    move with the level in between. """
+
+    def __init__(self, field_of_view, screen_w, screen_h):
+        """ (FieldOfView, int, int) -> Fog
+        Instantiate fog for the given field of view on a screen of the given size.
+        """
+        self.field_of_view = field_of_view
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.image = None           # Strip of fog as wide as the longest run and one cell high
+        self.runs = []              # On-screen Rects of the runs of fogged cells
+        self.rect = pygame.Rect(0, 0, 0, 0)     # Boundaries of all of the runs
+        self.version = -1           # Version of the field of view that the runs show
+
+    def set_field_of_view(self, field_of_view):
+        """ (FieldOfView) -> None
+        Show the given field of view from now on.
+        """
+        self.field_of_view = field_of_view
+        self.version = -1
+
+    def resize(self, w, h):
+        """ (int, int) -> None
+        Cover a screen of the given width and height from now on.
+        """
+        self.screen_w, self.screen_h = w, h
+        self.version = -1
+
+    def shift(self, dx, dy):
+        """ (int, int) -> None
+        Move the fog along with the rest of the level.
+        """
+        self.rect.move_ip(dx, dy)
+        for run in self.runs:
+            run.move_ip(dx, dy)
+
+    def update(self):
+        """ (None) -> None
+        Find the runs of fogged cells again if the field of view changed. The runs cover the cells
+        within a screen of the viewer's cell, with a cell to spare on every side, so they cover the
+        whole screen while the viewer stays in that cell.
+        """
+        fov = self.field_of_view
+        if fov.version == self.version:
+            return
+        self.version = fov.version
+        self.runs = []
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        if fov.origin < 0:
+            return
+        grid, size = fov.grid, fov.grid.cell_size
+        half_cols, half_rows = self.screen_w // (2 * size) + 2, self.screen_h // (2 * size) + 2
+        first_col, last_col = fov.origin % grid.cols - half_cols, fov.origin % grid.cols + half_cols
+        first_row, last_row = fov.origin // grid.cols - half_rows, fov.origin // grid.cols + half_rows
+        if self.image is None or self.image.get_width() < (last_col - first_col + 1) * size or \
+                self.image.get_height() != size:
+            self.image = pygame.Surface(((last_col - first_col + 1) * size, size)).convert()
+            self.image.fill(BLACK)
+            self.image.set_alpha(FOG_ALPHA)
+
+        # Cells outside of the grid are fogged too, since there is nothing to see there.
+        for row in range(first_row, last_row + 1):
+            y = grid.origin_y + row * size
+            start = None
+            for col in range(first_col, last_col + 2):
+                fogged = col <= last_col and not (0 <= row < grid.rows and 0 <= col < grid.cols and
+                                                  fov.visible[row * grid.cols + col])
+                if fogged and start is None:
+                    start = col
+                elif not fogged and start is not None:
+                    self.runs.append(pygame.Rect(grid.origin_x + start * size, y, (col - start) * size, size))
+                    start = None
+        if self.runs:
+            self.rect = self.runs[0].unionall(self.runs)
+
+    def draw(self, surface):
+        """ (Surface) -> None
+        Draw the fog onto the given Surface.
+        """
+        image = self.image
+        for run in self.runs:
+            surface.blit(image, run, (0, 0, run.width, run.height))
@@ -0,0 +1,67 @@
+#####################################
+# Filename: render_benchmark.py
+# Description: Compares drawing a crowded level with one blit call per object
+#               against drawing it through the batched render queue
+#####################################
+import argparse, os, random, time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched against per-object level drawing.')
+    parser.add_argument('-e', '--enemies', type=int, default=300, help='enemies on screen')
+    parser.add_argument('-i', '--items', type=int, default=100, help='items on screen')
+    parser.add_argument('-b', '--bullets', type=int, default=50, help='bullets on screen')
+    parser.add_argument('-f', '--frames', type=int, default=300, help='frames to draw with each method')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed of the level layout')
+    parser.add_argument('--size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'),
+                        help='screen size to draw at')
+    args = parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame
+    from modules.bullet import Bullet
+    from modules.constants import BLACK
+    from modules.entities import ENEMY, BULLET
+    from modules.level import Level
+    pygame.display.init()
+    pygame.font.init()
+    surface = pygame.display.set_mode(args.size)
+
+    # Fill the screen around the player with enemies, items and bullets.
+    random.seed(args.seed)
+    level = Level('concrete.png', 'rockwall.png')
+    level.screen_w, level.screen_h = args.size
+    level.generate()
+    w, h = args.size
+    level.entities.remove_all(ENEMY)
+    for i in range(args.enemies):
+        level.spawn_enemy(random.randint(0, w), random.randint(0, h))
+    for i in range(args.items):
+        item = level.add_item(random.choice(level.food_images), 'food')
+        item.x, item.y = random.randint(0, w), random.randint(0, h)
+        item.update()
+    for i in range(args.bullets):
+        bullet = Bullet(BLACK, random.randint(0, w), random.randint(0, h), 16, random.randint(0, 359))
+        bullet.update()
+        level.entities.add(bullet, BULLET)
+
+    results = {}
+    for batched in False, True:
+        level.draw(surface, batched)        # Warm up the image caches
+        start = time.time()
+        for frame in range(args.frames):
+            level.draw(surface, batched)
+        results[batched] = 1000.0 * (time.time() - start) / args.frames
+        results[batched, 'pixels'] = pygame.image.tostring(surface, 'RGB')
+
+    print('Drew %d tiles, %d enemies, %d items and %d bullets %d times at %dx%d.' %
+          (len(level.geometry.walls + level.geometry.floors), args.enemies, args.items, args.bullets, args.frames, w, h))
+    print('Per-object blits: %.2f ms per frame' % results[False])
+    print('Render queue:     %.2f ms per frame (%d blits per frame, %s)' %
+          (results[True], level.render_queue.count,
+           'Surface.blits' if hasattr(surface, 'blits') else 'Surface.blits unavailable, blitting in a loop'))
+    print('Identical output: %s' % (results[False, 'pixels'] == results[True, 'pixels']))
+
+
+if __name__ == '__main__':
+    main()
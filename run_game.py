@@ -4,8 +4,21 @@
 # Filename: run_game.py
 # Description: Launching point for the Supremacy game
 #####################################
+import argparse
 import modules.game, modules.constants
 
 if __name__ == '__main__':
-    game = modules.game.Game(modules.constants.SMOOTH_FPS)
+    parser = argparse.ArgumentParser(description='Play Supremacy.')
+    parser.add_argument('--render-size', type=int, nargs=2, metavar=('W', 'H'),
+                        help='draw the game at this resolution and scale it up to the screen (default: screen size)')
+    parser.add_argument('--dynamic-resolution', action='store_true',
+                        help='lower the render resolution while the game cannot keep up with the frame rate')
+    parser.add_argument('--smooth', action='store_true', help='smooth the scaled-up picture')
+    parser.add_argument('--raw-capture', action='store_true',
+                        help='record frames (toggled with F12) as raw RGB files instead of PNG images')
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help='log gameplay events to this file (convert it with telemetry_csv.py)')
+    args = parser.parse_args()
+    game = modules.game.Game(modules.constants.SMOOTH_FPS, args.render_size, args.dynamic_resolution, args.smooth,
+                             args.raw_capture, args.telemetry)
     game.run()
@@ -0,0 +1,145 @@
+#####################################
+# Filename: simulate.py
+# Description: Plays many levels with a scripted bot in parallel, without
+#               opening a window, and reports difficulty statistics
+#####################################
+import argparse, json, multiprocessing, os, time
+
+SAMPLE_FRAMES = 60      # Resources are sampled once per second of game time
+
+
+def init_worker():
+    """ (None) -> None
+    Prepare a worker process to play levels without a visible display.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+
+
+def simulate_level(task):
+    """ (tuple) -> dict
+    Play one level for the given (seed, level number, frame limit, screen width, screen height)
+    task with a fresh player and return the outcome, resource samples, enemy update counts and
+    entity pool statistics.
+    """
+    import random
+    from modules.bot import Bot
+    from modules.level import Level
+    seed, level_num, max_frames, screen_w, screen_h = task
+    random.seed(seed)
+    level = Level('concrete.png', 'rockwall.png')
+    level.level_num = level_num
+    level.screen_w, level.screen_h = screen_w, screen_h
+    level.generate()
+    level.controller = Bot()
+
+    start = time.clock()     # Process CPU time under Python 2 on Linux
+    samples = []
+    outcome = 'timeout'
+    frame = 0
+    enemy_updates = dict.fromkeys(('active', 'reduced', 'sleeping'), 0)
+    while frame < max_frames:
+        if frame % SAMPLE_FRAMES == 0:
+            samples.append((level.player.health, level.player.hunger, level.ammo))
+        level.update()
+        level.scheduler.run()
+        for key, count in level.lod.get_stats().items():
+            enemy_updates[key] += count
+        frame += 1
+        if level.player.health <= 0:
+            outcome = 'died'
+            break
+        if level.level_num > level_num:
+            outcome = 'completed'
+            break
+    return {'seed': seed, 'level': level_num, 'outcome': outcome, 'frames': frame,
+            'cpu_seconds': time.clock() - start, 'samples': samples, 'enemy_updates': enemy_updates,
+            'pools': {'bullet': level.bullet_pool.get_stats(), 'splatter': level.splatter_pool.get_stats()}}
+
+
+def mean(values):
+    """ (list) -> float
+    Return the mean of the given numbers, or 0.0 if there are none.
+    """
+    return sum(values) / float(len(values)) if values else 0.0
+
+
+def aggregate(results, fps):
+    """ (list, int) -> dict
+    Return survival rates, level times and resource curves for the given results, by level.
+    """
+    summary = {}
+    for level_num in sorted(set(run['level'] for run in results)):
+        runs = [run for run in results if run['level'] == level_num]
+        completed = [run for run in runs if run['outcome'] == 'completed']
+        longest = max(len(run['samples']) for run in runs)
+        curves = {'health': [], 'hunger': [], 'ammo': [], 'alive': []}
+        for second in range(longest):
+            alive = [run['samples'][second] for run in runs if len(run['samples']) > second]
+            curves['alive'].append(len(alive))
+            for i, resource in enumerate(('health', 'hunger', 'ammo')):
+                curves[resource].append(round(mean([sample[i] for sample in alive]), 2))
+        summary['level %d' % level_num] = {
+            'runs': len(runs),
+            'survival_rate': len(completed) / float(len(runs)),
+            'death_rate': sum(1 for run in runs if run['outcome'] == 'died') / float(len(runs)),
+            'timeout_rate': sum(1 for run in runs if run['outcome'] == 'timeout') / float(len(runs)),
+            'mean_seconds_to_complete': mean([run['frames'] / float(fps) for run in completed]),
+            'resource_curves': curves,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play levels with a scripted bot and report difficulty statistics.')
+    parser.add_argument('-n', '--runs', type=int, default=200, help='games to simulate per level')
+    parser.add_argument('-l', '--levels', type=int, nargs='+', default=[1, 2, 3, 4], help='level numbers')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('-w', '--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--minutes', type=float, default=5, help='game time limit for each level')
+    parser.add_argument('--fps', type=int, default=60, help='frame rate that game time is measured at')
+    parser.add_argument('--size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'),
+                        help='screen size to simulate')
+    parser.add_argument('-o', '--output', default='simulation.json', help='statistics file')
+    args = parser.parse_args()
+
+    max_frames = int(args.minutes * 60 * args.fps)
+    tasks = [(args.seed + i, level_num, max_frames, args.size[0], args.size[1])
+             for level_num in args.levels for i in range(args.runs)]
+    start = time.time()
+    pool = multiprocessing.Pool(args.workers, init_worker)
+    try:
+        results = list(pool.imap_unordered(simulate_level, tasks))
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - start
+
+    frames = sum(run['frames'] for run in results)
+    summary = aggregate(results, args.fps)
+    summary['throughput'] = {'games': len(results), 'workers': args.workers, 'seconds': elapsed,
+                             'frames': frames,
+                             'frames_per_core_second': frames / sum(run['cpu_seconds'] for run in results),
+                             'frames_per_second': frames / elapsed}
+    summary['enemies_per_frame'] = dict((key, sum(run['enemy_updates'][key] for run in results) / float(frames))
+                                        for key in ('active', 'reduced', 'sleeping'))
+    summary['pools'] = dict((name, dict((key, sum(run['pools'][name][key] for run in results))
+                                        for key in ('created', 'reused')))
+                            for name in ('bullet', 'splatter'))
+    with open(args.output, 'w') as output:
+        json.dump(summary, output, indent=2, sort_keys=True)
+    print('Simulated %d games (%d frames) in %.1f seconds, %.0f frames per core-second. Statistics written to %s.' %
+          (len(results), frames, elapsed, summary['throughput']['frames_per_core_second'], args.output))
+    print('Enemies per frame: %(active).1f updated every frame, %(reduced).1f at a reduced rate, '
+          '%(sleeping).1f sleeping.' % summary['enemies_per_frame'])
+    for name in ('bullet', 'splatter'):
+        stats = summary['pools'][name]
+        print('%s pool: %d instances created, %d reused.' % (name.capitalize(), stats['created'], stats['reused']))
+
+
+if __name__ == '__main__':
+    main()
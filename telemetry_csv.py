@@ -0,0 +1,63 @@
+#####################################
+# Filename: telemetry_csv.py
+# Description: Converts a gameplay telemetry log to CSV, and measures how long
+#               recording an event takes
+#####################################
+import argparse, os, tempfile, timeit
+import modules.telemetry as telemetry
+
+
+def write_csv(log_path, csv_path):
+    """ (str, str) -> int
+    Write every event in the telemetry log at the given path to a CSV file at the other given
+    path, and return the number of events.
+    """
+    count = 0
+    with open(csv_path, 'w') as output:
+        output.write('frame,event,detail,value\n')
+        for frame, event, detail, value in telemetry.read_log(log_path):
+            name = telemetry.EVENT_NAMES[event] if event < len(telemetry.EVENT_NAMES) else str(event)
+            if event == telemetry.EVENT_PICKUP and detail < len(telemetry.ITEM_TYPES):
+                detail = telemetry.ITEM_TYPES[detail]
+            output.write('%d,%s,%s,%g\n' % (frame, name, detail, value))
+            count += 1
+    return count
+
+
+def measure_cost(events):
+    """ (int) -> tuple
+    Return the average number of microseconds that recording an event takes with telemetry on,
+    and with telemetry off, over the given number of events.
+    """
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.log')
+    log = telemetry.Telemetry(path, capacity=events)
+    try:
+        on = timeit.timeit(lambda: log.record(telemetry.EVENT_DAMAGE, 5), number=events)
+    finally:
+        log.close()
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    off = timeit.timeit(lambda: telemetry.NO_TELEMETRY.record(telemetry.EVENT_DAMAGE, 5), number=events)
+    return 1e6 * on / events, 1e6 * off / events
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a telemetry log written with run_game.py --telemetry to CSV.')
+    parser.add_argument('log', nargs='?', help='telemetry log')
+    parser.add_argument('-o', '--output', help='CSV file (default: the log name with a .csv extension)')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='instead, measure the average cost of recording N events')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        on, off = measure_cost(args.benchmark)
+        print('Recording an event takes %.2f microseconds, or %.2f with telemetry off.' % (on, off))
+    elif args.log:
+        output = args.output or os.path.splitext(args.log)[0] + '.csv'
+        print('Wrote %d events to %s.' % (write_csv(args.log, output), output))
+    else:
+        parser.error('a telemetry log or --benchmark is required')
+
+
+if __name__ == '__main__':
+    main()